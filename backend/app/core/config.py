@@ -7,5 +7,52 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 JWT_SECRET = os.getenv("JWT_SECRET", "dev-only-change-me")
 JWT_ALG = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
+# calendar apps keep subscription URLs for a long time
+CALENDAR_FEED_TOKEN_EXPIRE_DAYS = int(os.getenv("CALENDAR_FEED_TOKEN_EXPIRE_DAYS", "365"))
 GOOGLE_CLIENT_ID = os.environ.get("GOOGLE_CLIENT_ID")
+# overridable so tests can point Google sign-in at a local key server
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+
+MEMBERSHIP_CACHE_TTL_SECONDS = float(os.getenv("MEMBERSHIP_CACHE_TTL_SECONDS", "60"))
+MEMBERSHIP_CACHE_MAX_ENTRIES = int(os.getenv("MEMBERSHIP_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv("PASSWORD_HASH_QUEUE_DEPTH", "16"))
+# "bcrypt" or "argon2"; hashes in the other scheme are upgraded on login
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST_KIB = int(os.getenv("ARGON2_MEMORY_COST_KIB", "19456"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+NOTIFICATION_DISPATCH_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_DISPATCH_INTERVAL_SECONDS", "2"))
+NOTIFICATION_DISPATCH_BATCH_SIZE = int(os.getenv("NOTIFICATION_DISPATCH_BATCH_SIZE", "500"))
+# unread notifications with the same subject and recipient are merged
+# into one digest row for this long
+NOTIFICATION_COALESCE_WINDOW_SECONDS = float(os.getenv("NOTIFICATION_COALESCE_WINDOW_SECONDS", "300"))
+# read notifications older than this are archived or deleted in batches
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+# "archive" moves them to notifications_archive, "delete" drops them
+NOTIFICATION_RETENTION_MODE = os.getenv("NOTIFICATION_RETENTION_MODE", "archive")
+NOTIFICATION_COMPACTION_BATCH_SIZE = int(os.getenv("NOTIFICATION_COMPACTION_BATCH_SIZE", "1000"))
+# event reminders: how far ahead the in-memory schedule reaches, how often it
+# is reloaded, and how late a missed reminder may still be sent
+REMINDER_HORIZON_HOURS = float(os.getenv("REMINDER_HORIZON_HOURS", "6"))
+REMINDER_RELOAD_SECONDS = float(os.getenv("REMINDER_RELOAD_SECONDS", "300"))
+REMINDER_LATE_GRACE_MINUTES = float(os.getenv("REMINDER_LATE_GRACE_MINUTES", "10"))
+# longest allowed event; calendar queries rely on it to bound their index scans
+EVENT_MAX_DURATION_DAYS = int(os.getenv("EVENT_MAX_DURATION_DAYS", "31"))
+# recurring events are expanded per UTC month and cached; a calendar query
+# may span at most RECURRENCE_MAX_WINDOW_DAYS
+RECURRENCE_CACHE_MAX_ENTRIES = int(os.getenv("RECURRENCE_CACHE_MAX_ENTRIES", "5000"))
+RECURRENCE_CACHE_TTL_SECONDS = float(os.getenv("RECURRENCE_CACHE_TTL_SECONDS", "3600"))
+RECURRENCE_MAX_OCCURRENCES_PER_MONTH = int(os.getenv("RECURRENCE_MAX_OCCURRENCES_PER_MONTH", "500"))
+RECURRENCE_MAX_COUNT = int(os.getenv("RECURRENCE_MAX_COUNT", "1000"))
+RECURRENCE_MAX_WINDOW_DAYS = int(os.getenv("RECURRENCE_MAX_WINDOW_DAYS", "366"))
+# "memory" only reaches streams in the process that dispatched the notification;
+# use "postgres" (LISTEN/NOTIFY) when running more than one API process.
+NOTIFICATION_STREAM_BACKEND = os.getenv("NOTIFICATION_STREAM_BACKEND", "memory")
+NOTIFICATION_STREAM_QUEUE_SIZE = int(os.getenv("NOTIFICATION_STREAM_QUEUE_SIZE", "100"))
+NOTIFICATION_STREAM_HEARTBEAT_SECONDS = float(os.getenv("NOTIFICATION_STREAM_HEARTBEAT_SECONDS", "15"))
 print("DATABASE_URL =", DATABASE_URL)
\ No newline at end of file
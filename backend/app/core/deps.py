@@ -1,18 +1,32 @@
+import time
+
 from fastapi import Depends, HTTPException
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
+from app.core.config import AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS
 from app.core.jwt import decode_token
 from app.db.session import get_db
 from app.models.user import User
 
 bearer = HTTPBearer()
 
-def get_current_user(
-    creds: HTTPAuthorizationCredentials = Depends(bearer),
-    db: Session = Depends(get_db),
-) -> User:
-    token = creds.credentials
+# token -> user id, never kept past the token's own exp
+token_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+# user id -> column values of the users row
+user_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id: str) -> None:
+    user_cache.invalidate(str(user_id))
+
+
+def _user_id_from_token(token: str) -> str:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
+
     try:
         payload = decode_token(token)
         user_id = payload.get("sub")
@@ -21,8 +35,43 @@ def get_current_user(
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
 
+    exp = payload.get("exp")
+    if exp is not None:
+        token_cache.set(token, user_id, ttl_seconds=float(exp) - time.time())
+    return user_id
+
+
+def _attach_cached_user(db: Session, values: dict) -> User:
+    # Rebuild the row as a persistent instance without a SELECT so endpoints
+    # can still modify and commit current_user.
+    user = User(**values)
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
+def get_current_user(
+    creds: HTTPAuthorizationCredentials = Depends(bearer),
+    db: Session = Depends(get_db),
+) -> User:
+    user_id = _user_id_from_token(creds.credentials)
+
+    values = user_cache.get(user_id)
+    if values is not None:
+        return _attach_cached_user(db, values)
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
\ No newline at end of file
+    user_cache.set(
+        user_id,
+        {column.key: getattr(user, column.key) for column in User.__table__.columns},
+    )
+    return user
+
+
+def get_admin_user(current_user: User = Depends(get_current_user)) -> User:
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return current_user
@@ -1,14 +1,19 @@
 from datetime import datetime, timedelta, timezone
 from jose import jwt, JWTError
-from app.core.config import JWT_SECRET, JWT_ALG, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import JWT_SECRET, JWT_ALG, ACCESS_TOKEN_EXPIRE_MINUTES, CALENDAR_FEED_TOKEN_EXPIRE_DAYS
 from fastapi import HTTPException
 
 def create_access_token(user_id: str) -> str:
     exp = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    return jwt.encode({"sub": user_id, "exp": exp}, JWT_SECRET, algorithm=JWT_ALG)
+    return jwt.encode({"sub": user_id, "exp": exp, "type": "access"}, JWT_SECRET, algorithm=JWT_ALG)
 
 def decode_token(token: str) -> dict:
-    return jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+    # reset and calendar feed tokens share the secret but must never
+    # authenticate API calls
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG])
+    if payload.get("type") != "access":
+        raise JWTError("Not an access token")
+    return payload
 
 def create_password_reset_token(email: str) -> str:
     exp = datetime.now(timezone.utc) + timedelta(minutes=30)
@@ -34,4 +39,35 @@ def verify_password_reset_token(token: str) -> str:
         return email
 
     except JWTError:
-        raise HTTPException(status_code=400, detail="Invalid or expired reset token")
\ No newline at end of file
+        raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+
+
+CALENDAR_FEED_AUDIENCE = "sprintwheel:calendar_feed"
+
+
+def create_calendar_feed_token(user_id: str, project_id) -> str:
+    exp = datetime.now(timezone.utc) + timedelta(days=CALENDAR_FEED_TOKEN_EXPIRE_DAYS)
+    payload = {
+        "sub": user_id,
+        "project": str(project_id),
+        "exp": exp,
+        "type": "calendar_feed",
+        "aud": CALENDAR_FEED_AUDIENCE,
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALG)
+
+
+def verify_calendar_feed_token(token: str, project_id) -> str:
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALG], audience=CALENDAR_FEED_AUDIENCE)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Invalid or expired calendar token")
+
+    if payload.get("type") != "calendar_feed" or payload.get("project") != str(project_id):
+        raise HTTPException(status_code=401, detail="Invalid calendar token")
+
+    user_id = payload.get("sub")
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Invalid calendar token")
+
+    return user_id
@@ -1,8 +1,125 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
 from passlib.context import CryptContext
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(p: str) -> str:
-    return pwd_context.hash(p)
+from app.core.config import (
+    ARGON2_MEMORY_COST_KIB,
+    ARGON2_PARALLELISM,
+    ARGON2_TIME_COST,
+    BCRYPT_ROUNDS,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_WORKERS,
+)
+
+
+def build_pwd_context(scheme: str = PASSWORD_HASH_SCHEME) -> CryptContext:
+    if scheme not in ("bcrypt", "argon2"):
+        raise ValueError(f"Unsupported PASSWORD_HASH_SCHEME: {scheme}")
+
+    # bcrypt stays verifiable so existing users can log in and be rehashed;
+    # pinning min/max rounds flags hashes made with any other work factor.
+    schemes = ["argon2", "bcrypt"] if scheme == "argon2" else ["bcrypt"]
+    return CryptContext(
+        schemes=schemes,
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS,
+        argon2__time_cost=ARGON2_TIME_COST,
+        argon2__memory_cost=ARGON2_MEMORY_COST_KIB,
+        argon2__parallelism=ARGON2_PARALLELISM,
+    )
+
+
+pwd_context = build_pwd_context()
+
+
+class PasswordHashPool:
+    """Dedicated, bounded executor for bcrypt work.
+
+    Callers await the result on the event loop, so waiting for a hash holds
+    no slot in the shared request threadpool. At most workers + queue_depth
+    hashes are accepted at once; anything beyond that is rejected with a 503
+    instead of queueing.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "rejected": 0,
+            "in_flight": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+        }
+
+    async def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+        with self._lock:
+            self._stats["submitted"] += 1
+            self._stats["in_flight"] += 1
+        started = time.perf_counter()
+
+        def finished(_future):
+            # the slot is held until the work itself ends, even if the
+            # awaiting request was cancelled first
+            elapsed = time.perf_counter() - started
+            self._slots.release()
+            with self._lock:
+                self._stats["in_flight"] -= 1
+                self._stats["completed"] += 1
+                self._stats["total_seconds"] += elapsed
+                self._stats["max_seconds"] = max(self._stats["max_seconds"], elapsed)
+
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            finished(None)
+            raise
+        future.add_done_callback(finished)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = self.workers
+        stats["queue_depth"] = self.queue_depth
+        stats["avg_seconds"] = (
+            stats["total_seconds"] / stats["completed"] if stats["completed"] else 0.0
+        )
+        return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+password_pool = PasswordHashPool(PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_DEPTH)
+
+
+async def hash_password(p: str) -> str:
+    return await password_pool.run(pwd_context.hash, p)
+
+async def verify_password(p: str, h: str) -> bool:
+    return await password_pool.run(pwd_context.verify, p, h)
 
-def verify_password(p: str, h: str) -> bool:
-    return pwd_context.verify(p, h)
+async def verify_and_update_password(p: str, h: str) -> tuple[bool, str | None]:
+    return await password_pool.run(pwd_context.verify_and_update, p, h)
@@ -0,0 +1,49 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.models.notification import Notification
+from app.models.project_event import ProjectEvent
+from app.models.story import Story
+
+# create_all only creates missing tables, so columns and indexes added to
+# tables that already exist are applied here on startup. Every step must be
+# safe to run again on a database that already has it.
+COLUMN_UPGRADES = [
+    "ALTER TABLE notifications ADD COLUMN IF NOT EXISTS subject VARCHAR",
+    "ALTER TABLE notifications ADD COLUMN IF NOT EXISTS occurrences INTEGER NOT NULL DEFAULT 1",
+    "ALTER TABLE notifications ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITHOUT TIME ZONE",
+    "ALTER TABLE notification_outbox ADD COLUMN IF NOT EXISTS subject VARCHAR",
+    # backlog ranks (microseconds since the epoch, RANK_STEP * n) need bigint
+    """
+    DO $$
+    BEGIN
+        IF (
+            SELECT data_type FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = 'stories' AND column_name = 'priority'
+        ) = 'integer' THEN
+            ALTER TABLE stories ALTER COLUMN priority TYPE BIGINT;
+        END IF;
+    END $$
+    """,
+]
+
+INDEX_UPGRADES = [
+    (Notification.__table__, "ix_notifications_user_created_id"),
+    (Notification.__table__, "ix_notifications_user_unread_created_id"),
+    (Notification.__table__, "ix_notifications_user_subject_unread"),
+    (Notification.__table__, "ix_notifications_read_created"),
+    (ProjectEvent.__table__, "ix_project_events_project_start"),
+    (ProjectEvent.__table__, "ix_project_events_recurring_project_start"),
+    (Story.__table__, "ix_stories_project_sprint_priority"),
+]
+
+
+def upgrade_schema(engine: Engine) -> None:
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as conn:
+        for statement in COLUMN_UPGRADES:
+            conn.execute(text(statement))
+        for table, index_name in INDEX_UPGRADES:
+            index = next(index for index in table.indexes if index.name == index_name)
+            index.create(conn, checkfirst=True)
@@ -1,5 +1,7 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
+from app.core.deps import get_admin_user
 from app.db.session import Base, engine
+from app.db.schema_upgrades import upgrade_schema
 from app.models import User
 from app.routers.auth import router as auth_router
 from app.routers.project import router as projects_router
@@ -14,13 +16,24 @@ from app.routers.edu import router as edu_router
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.services.notification_scheduler import create_scheduler
+from app.core.security import password_pool
+from app.services.email_outbox import email_outbox
+from app.services.notification_stream import notification_broker
+from app.services.event_reminders import reminder_scheduler
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     scheduler = create_scheduler()
     scheduler.start()
+    email_outbox.start()
+    notification_broker.start()
+    reminder_scheduler.start()
     yield
     scheduler.shutdown()
+    reminder_scheduler.stop()
+    notification_broker.stop()
+    email_outbox.stop()
+    password_pool.shutdown()
 
 app = FastAPI(title="SprintWheel API", lifespan=lifespan)
 
@@ -34,16 +47,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+# pool internals (queue depth, rejections) are for operators only
+@app.get("/health/password-hashing", dependencies=[Depends(get_admin_user)])
+def password_hashing_health():
+    return password_pool.stats()
+
 app.include_router(auth_router)
 app.include_router(projects_router)
 app.include_router(sprints_router)
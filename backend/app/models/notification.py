@@ -1,7 +1,7 @@
 from uuid import uuid4
 from datetime import datetime
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, String, Boolean, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from app.db.session import Base
 
 class Notification(Base):
@@ -10,4 +10,63 @@ class Notification(Base):
     user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"))  
     message = Column(String, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # notifications about the same thing (e.g. one task's status) share a
+    # subject so repeats can be merged into one digest row
+    subject = Column(String, nullable=True)
+    occurrences = Column(Integer, nullable=False, default=1)
+    # time of the latest occurrence merged into a digest; created_at stays
+    # fixed so the (created_at, id) feed cursor remains stable
+    updated_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # keyset feed: WHERE user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+        Index("ix_notifications_user_created_id", "user_id", "created_at", "id"),
+        Index(
+            "ix_notifications_user_unread_created_id",
+            "user_id",
+            "created_at",
+            "id",
+            postgresql_where=(is_read == False),
+        ),
+        Index(
+            "ix_notifications_user_subject_unread",
+            "user_id",
+            "subject",
+            postgresql_where=(is_read == False) & (subject != None),
+        ),
+        # retention compaction: oldest read rows first
+        Index("ix_notifications_read_created", "created_at", postgresql_where=(is_read == True)),
+    )
+
+
+class NotificationArchive(Base):
+    # read notifications past NOTIFICATION_RETENTION_DAYS, moved here by
+    # notification_retention when NOTIFICATION_RETENTION_MODE is "archive"
+    __tablename__ = "notifications_archive"
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    message = Column(String, nullable=False)
+    is_read = Column(Boolean, default=True)
+    created_at = Column(DateTime, index=True)
+    subject = Column(String, nullable=True)
+    occurrences = Column(Integer, nullable=False, default=1)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class NotificationCounter(Base):
+    __tablename__ = "notification_counters"
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+
+
+class NotificationOutbox(Base):
+    # Written in the caller's transaction; notification_dispatcher expands
+    # project_id into its members and delivers the rows asynchronously.
+    __tablename__ = "notification_outbox"
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    project_id = Column(UUID(as_uuid=True), nullable=True)
+    user_ids = Column(ARRAY(String), nullable=False, default=list)
+    message = Column(String, nullable=False)
+    subject = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, Boolean, ForeignKey, Index, Integer, Text, func
 from sqlalchemy.dialects.postgresql import UUID
 from uuid import uuid4
 
@@ -23,4 +23,36 @@ class ProjectEvent(Base):
     timezone = Column(String, nullable=True)
     rrule = Column(String, nullable=True)
 
-    is_cancelled = Column(Boolean, nullable=False, default=False)
\ No newline at end of file
+    is_cancelled = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        # calendar range scans: project_id = ? AND start_at BETWEEN window_start
+        # - EVENT_MAX_DURATION_DAYS AND window_end, so both ends bound the scan
+        Index("ix_project_events_project_start", "project_id", "start_at"),
+        # recurring series are fetched separately by start_at < window_end
+        Index(
+            "ix_project_events_recurring_project_start",
+            "project_id",
+            "start_at",
+            postgresql_where=(rrule != None),
+        ),
+    )
+
+
+class EventReminderDelivery(Base):
+    # one row per reminder sent; the primary key makes re-sends a no-op
+    __tablename__ = "event_reminder_deliveries"
+
+    event_id = Column(String, ForeignKey("project_events.id", ondelete="CASCADE"), primary_key=True)
+    occurrence_start = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(String, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    sent_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+
+class ProjectCalendarVersion(Base):
+    # bumped on every event write so calendar feeds can answer If-None-Match
+    # without reading project_events
+    __tablename__ = "project_calendar_versions"
+
+    project_id = Column(UUID(as_uuid=True), ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
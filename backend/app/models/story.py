@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Boolean, Date
+from sqlalchemy import BigInteger, Column, String, Integer, ForeignKey, Boolean, Date, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -22,8 +22,15 @@ class Story(Base):
     points = Column(Integer, nullable=True)
 
     isDone = Column(Boolean, default=False)
-    priority = Column(Integer, default=10)
+    # sparse rank, higher first; see app/services/backlog_rank.py
+    priority = Column(BigInteger, default=10)
     date_completed = Column(Date, nullable=True)
     date_added = Column(Date, nullable=True)
 
-    project = relationship("Project", back_populates="stories")
\ No newline at end of file
+    project = relationship("Project", back_populates="stories")
+
+    __table_args__ = (
+        # backlog and sprint views: WHERE project_id = ? AND sprint_id {= ? | IS NULL}
+        # ORDER BY priority DESC, id DESC, paged by keyset
+        Index("ix_stories_project_sprint_priority", "project_id", "sprint_id", "priority", "id"),
+    )
\ No newline at end of file
@@ -1,25 +1,24 @@
 import os
-import smtplib
+import queue
 import uuid
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 
 from fastapi import APIRouter, Depends, HTTPException
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.core.config import GOOGLE_CLIENT_ID
-from app.core.deps import get_current_user
+from app.core.deps import get_current_user, invalidate_cached_user
 from app.core.jwt import (
     create_access_token,
     create_password_reset_token,
     verify_password_reset_token,
 )
-from app.core.security import hash_password, verify_password
+from app.core.security import hash_password, verify_and_update_password, verify_password
 from app.db.session import get_db
 from app.models.user import User
+from app.services.email_outbox import OutgoingEmail, email_outbox
+from app.services.google_auth import get_google_verifier
 from app.schemas import LoginIn, RegisterIn, TokenOut, UserOut
 from app.schemas.auth import (
     ChangeNameIn,
@@ -30,19 +29,27 @@ from app.schemas.auth import (
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+# Endpoints that hash or verify passwords are async so that waiting on the
+# password pool holds no threadpool slot; their database work still runs in
+# the threadpool through run_in_threadpool.
+
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.query(User).filter(User.email == email).first()
+
+
+def save_user(db: Session, user: User) -> None:
+    db.commit()
+    invalidate_cached_user(user.id)
+    db.refresh(user)
+
 
 class GoogleLoginIn(BaseModel):
     id_token: str
 
 
 def send_password_reset_email(email: str, reset_link: str):
-    smtp_host = os.getenv("SMTP_HOST")
-    smtp_port = int(os.getenv("SMTP_PORT", "587"))
-    smtp_user = os.getenv("SMTP_USER")
-    smtp_pass = os.getenv("SMTP_PASS")
-    from_email = os.getenv("FROM_EMAIL", smtp_user)
-
-    if not smtp_host or not smtp_user or not smtp_pass:
+    if not email_outbox.settings().configured:
         raise HTTPException(
             status_code=500,
             detail="SMTP email settings are not configured",
@@ -63,16 +70,14 @@ Thanks,
 SprintWheel
 """.strip()
 
-    msg = MIMEMultipart()
-    msg["From"] = from_email
-    msg["To"] = email
-    msg["Subject"] = subject
-    msg.attach(MIMEText(body, "plain"))
-
-    with smtplib.SMTP(smtp_host, smtp_port) as server:
-        server.starttls()
-        server.login(smtp_user, smtp_pass)
-        server.sendmail(from_email, email, msg.as_string())
+    try:
+        email_outbox.enqueue(OutgoingEmail(to=email, subject=subject, body=body))
+    except queue.Full:
+        raise HTTPException(
+            status_code=503,
+            detail="Email service is busy, please retry",
+            headers={"Retry-After": "5"},
+        )
 
 
 @router.post("/forgot-password")
@@ -94,7 +99,7 @@ def forgot_password(data: ForgotPasswordIn, db: Session = Depends(get_db)):
 
 
 @router.post("/reset-password")
-def reset_password(data: ResetPasswordIn, db: Session = Depends(get_db)):
+async def reset_password(data: ResetPasswordIn, db: Session = Depends(get_db)):
     if len(data.new_password) < 8:
         raise HTTPException(
             status_code=400,
@@ -109,20 +114,19 @@ def reset_password(data: ResetPasswordIn, db: Session = Depends(get_db)):
 
     email = verify_password_reset_token(data.token)
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.hashed_password = hash_password(data.new_password)
-    db.commit()
-    db.refresh(user)
+    user.hashed_password = await hash_password(data.new_password)
+    await run_in_threadpool(save_user, db, user)
 
     return {"message": "Password reset successful"}
 
 
 @router.post("/register", response_model=UserOut)
-def register(data: RegisterIn, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == data.email).first()
+async def register(data: RegisterIn, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(get_user_by_email, db, data.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
@@ -131,41 +135,38 @@ def register(data: RegisterIn, db: Session = Depends(get_db)):
         name=data.name,
         email=data.email,
         role="student",
-        hashed_password=hash_password(data.password),
+        hashed_password=await hash_password(data.password),
     )
     db.add(user)
-    db.flush()
-    db.commit()
-    db.refresh(user)
+    await run_in_threadpool(save_user, db, user)
     return user
 
 
 @router.put("/change-password")
-def change_password(
+async def change_password(
     data: ChangePasswordIn,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    if not verify_password(data.current_password, current_user.hashed_password):
+    if not await verify_password(data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Current password is incorrect",
         )
 
-    current_user.hashed_password = hash_password(data.new_password)
-    db.commit()
-    db.refresh(current_user)
+    current_user.hashed_password = await hash_password(data.new_password)
+    await run_in_threadpool(save_user, db, current_user)
 
     return {"message": "Password updated successfully"}
 
 
 @router.put("/change-name", response_model=UserOut)
-def change_name(
+async def change_name(
     data: ChangeNameIn,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    if not verify_password(data.current_password, current_user.hashed_password):
+    if not await verify_password(data.current_password, current_user.hashed_password):
         raise HTTPException(
             status_code=400,
             detail="Current password is incorrect",
@@ -177,18 +178,26 @@ def change_name(
         raise HTTPException(status_code=400, detail="New name cannot be empty")
 
     current_user.name = new_name
-    db.commit()
-    db.refresh(current_user)
+    await run_in_threadpool(save_user, db, current_user)
 
     return current_user
 
 
 @router.post("/login", response_model=TokenOut)
-def login(data: LoginIn, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.email == data.email).first()
-    if not user or not verify_password(data.password, user.hashed_password):
+async def login(data: LoginIn, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(get_user_by_email, db, data.email)
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+
+    verified, new_hash = await verify_and_update_password(data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(status_code=401, detail="Invalid email or password")
 
+    # transparently migrate hashes made with an old scheme or work factor
+    if new_hash:
+        user.hashed_password = new_hash
+        await run_in_threadpool(save_user, db, user)
+
     token = create_access_token(user.id)
     return {"access_token": token, "token_type": "bearer"}
 
@@ -199,16 +208,12 @@ def me(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/google", response_model=TokenOut)
-def google_login(data: GoogleLoginIn, db: Session = Depends(get_db)):
+async def google_login(data: GoogleLoginIn, db: Session = Depends(get_db)):
     if not GOOGLE_CLIENT_ID:
         raise HTTPException(status_code=500, detail="GOOGLE_CLIENT_ID not configured")
 
     try:
-        info = id_token.verify_oauth2_token(
-            data.id_token,
-            google_requests.Request(),
-            GOOGLE_CLIENT_ID,
-        )
+        info = await run_in_threadpool(get_google_verifier().verify, data.id_token, GOOGLE_CLIENT_ID)
     except Exception:
         raise HTTPException(status_code=401, detail="Invalid Google token")
 
@@ -221,7 +226,7 @@ def google_login(data: GoogleLoginIn, db: Session = Depends(get_db)):
     if not email:
         raise HTTPException(status_code=400, detail="Google account missing email")
 
-    user = db.query(User).filter(User.email == email).first()
+    user = await run_in_threadpool(get_user_by_email, db, email)
 
     if not user:
         user = User(
@@ -229,11 +234,10 @@ def google_login(data: GoogleLoginIn, db: Session = Depends(get_db)):
             name=name or "Google User",
             email=email,
             role="student",
-            hashed_password=hash_password(uuid.uuid4().hex),
+            hashed_password=await hash_password(uuid.uuid4().hex),
         )
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await run_in_threadpool(save_user, db, user)
 
     token = create_access_token(user.id)
     return {"access_token": token, "token_type": "bearer"}
\ No newline at end of file
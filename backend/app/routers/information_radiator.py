@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.core.deps import get_current_user
 from app.models.user import User
-from app.models.project_members import ProjectMember
+from app.services.membership import check_project_member
 from app.models.information_radiator import InformationRadiatorBoard, InformationRadiatorNote
 from app.schemas.information_radiator import InformationRadiatorResponse, NoteCreate, NoteOut, NoteMoveRequest, NoteContentUpdate
 
@@ -14,26 +14,13 @@ from app.schemas.information_radiator import InformationRadiatorResponse, NoteCr
 router = APIRouter(prefix="/radiator", tags=["information_radiator"])
 
 
-def require_project_member(db: Session, project_id: UUID, user_id: str) -> None:
-    pm = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == user_id,
-        )
-        .first()
-    )
-    if not pm:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-
 @router.get("/{project_id}", response_model=InformationRadiatorResponse)
 def get_or_create_radiator(
     project_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    require_project_member(db, project_id, current_user.id)
+    check_project_member(db, project_id, current_user.id)
 
     board = (
         db.query(InformationRadiatorBoard)
@@ -81,7 +68,7 @@ def create_note(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    require_project_member(db, board.project_id, current_user.id)
+    check_project_member(db, board.project_id, current_user.id)
 
     note = InformationRadiatorNote(
         board_id=board_id,
@@ -125,7 +112,7 @@ def move_note(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    require_project_member(db, board.project_id, current_user.id)
+    check_project_member(db, board.project_id, current_user.id)
 
     note.x_position = payload.x_position
     note.y_position = payload.y_position
@@ -162,7 +149,7 @@ def update_note_content(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    require_project_member(db, board.project_id, current_user.id)
+    check_project_member(db, board.project_id, current_user.id)
 
     note.content = payload.content
 
@@ -197,7 +184,7 @@ def archive_note(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    require_project_member(db, board.project_id, current_user.id)
+    check_project_member(db, board.project_id, current_user.id)
 
     note.is_archived = True
 
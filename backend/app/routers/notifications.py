@@ -1,37 +1,135 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import base64
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from uuid import UUID
 from app.db.session import get_db
 from app.core.deps import get_current_user
 from app.models.user import User
 from app.models.notification import Notification
+from app.core.config import NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+from app.services.notification_service import decrement_unread, get_unread_count
+from app.services.notification_stream import notification_broker
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(notification: Notification) -> str:
+    raw = f"{notification.created_at.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, notification_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), UUID(notification_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 @router.get("")
 def get_notifications(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    unread_only: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    return (
-        db.query(Notification)
-        .filter(Notification.user_id == current_user.id)
-        .order_by(Notification.created_at.desc())
+    q = db.query(Notification).filter(Notification.user_id == current_user.id)
+    if unread_only:
+        q = q.filter(Notification.is_read == False)
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        q = q.filter(
+            tuple_(Notification.created_at, Notification.id) < tuple_(created_at, notification_id)
+        )
+
+    rows = (
+        q.order_by(Notification.created_at.desc(), Notification.id.desc())
+        .limit(limit + 1)
         .all()
     )
 
+    # the page stays a plain list; the cursor for the next page rides in a header
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1])
+
+    return rows
+
+async def notification_events(request: Request, user_id: str):
+    subscription = notification_broker.subscribe(user_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            if subscription.overflowed and subscription.queue.empty():
+                # events were dropped while the client lagged; it should refetch
+                subscription.overflowed = False
+                yield "event: resync\ndata: {}\n\n"
+
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), NOTIFICATION_STREAM_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+                continue
+
+            if event.get("resync"):
+                yield "event: resync\ndata: {}\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: notification\ndata: {json.dumps(event)}\n\n"
+    finally:
+        notification_broker.unsubscribe(subscription)
+
+@router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    user_id = str(current_user.id)
+    # the stream can stay open for hours; do not hold a pooled connection for it
+    db.close()
+    return StreamingResponse(
+        notification_events(request, user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/unread-count")
+def get_notifications_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    return {"unread_count": get_unread_count(db, current_user.id)}
+
 @router.patch("/{notification_id}/read")
 def mark_as_read(
     notification_id: UUID,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    notif = db.query(Notification).filter(
+    marked = db.query(Notification).filter(
         Notification.id == notification_id,
         Notification.user_id == current_user.id,
-    ).first()
-    if notif:
-        notif.is_read = True
+        Notification.is_read == False,
+    ).update({"is_read": True}, synchronize_session=False)
+    if marked:
+        decrement_unread(db, current_user.id, marked)
         db.commit()
     return {"status": "ok"}
 
@@ -40,9 +138,10 @@ def mark_all_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    db.query(Notification).filter(
+    marked = db.query(Notification).filter(
         Notification.user_id == current_user.id,
         Notification.is_read == False,
     ).update({"is_read": True})
+    decrement_unread(db, current_user.id, marked)
     db.commit()
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 from app.models.edu import Edu
@@ -27,6 +27,7 @@ from app.models.task import Task
 from app.models.story import Story
 from app.services.notification_service import notify_added_to_project, notify_project_created
 from app.services.project_cleanup import delete_expired_projects
+from app.services.membership import invalidate_membership, require_project_member
 import random
 import re
 import string
@@ -54,6 +55,41 @@ def generate_unique_join_code(db: Session) -> str:
             return code
 
 
+def active_member_count_subquery(db: Session, project_ids):
+    return (
+        db.query(
+            ProjectMember.project_id.label("project_id"),
+            func.count(ProjectMember.id).label("active_member_count"),
+        )
+        .filter(
+            ProjectMember.project_id.in_(project_ids),
+            ProjectMember.is_active == True,
+        )
+        .group_by(ProjectMember.project_id)
+        .subquery()
+    )
+
+
+def count_active_members(db: Session, project_id: UUID) -> int:
+    counts = active_member_count_subquery(db, [project_id])
+    count = db.query(counts.c.active_member_count).scalar()
+    return int(count or 0)
+
+
+def project_out(project: Project, active_member_count: int) -> ProjectOut:
+    return ProjectOut(
+        id=project.id,
+        name=project.name,
+        join_code=project.join_code,
+        sprint_duration=project.sprint_duration,
+        project_velocity=project.project_velocity,
+        status=project.status,
+        archived_at=project.archived_at,
+        delete_after=project.delete_after,
+        active_member_count=active_member_count,
+    )
+
+
 @router.post("", response_model=ProjectOut)
 def create_project(
     data: ProjectCreate,
@@ -87,17 +123,7 @@ def create_project(
 
     db.commit()
     db.refresh(project)
-    return ProjectOut(
-        id=project.id,
-        name=project.name,
-        join_code=project.join_code,
-        sprint_duration=project.sprint_duration,
-        project_velocity=project.project_velocity,
-        status=project.status,
-        archived_at=project.archived_at,
-        delete_after=project.delete_after,
-        active_member_count=1,
-    )
+    return project_out(project, count_active_members(db, project.id))
 
 
 @router.post("/join-by-code")
@@ -155,6 +181,7 @@ def join_project_by_code(
     notify_added_to_project(db, current_user.id, project.name, data.role.value)
 
     db.commit()
+    invalidate_membership(project.id, current_user.id)
 
     return {
         "status": "ok",
@@ -169,9 +196,19 @@ def list_projects(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
+    my_project_ids = select(ProjectMember.project_id).where(
+        ProjectMember.user_id == current_user.id,
+        ProjectMember.is_active == True,
+    )
+    counts = active_member_count_subquery(db, my_project_ids)
     rows = (
-        db.query(Project, ProjectMember.role)
+        db.query(
+            Project,
+            ProjectMember.role,
+            func.coalesce(counts.c.active_member_count, 0),
+        )
         .join(ProjectMember, ProjectMember.project_id == Project.id)
+        .outerjoin(counts, counts.c.project_id == Project.id)
         .filter(
             ProjectMember.user_id == current_user.id,
             ProjectMember.is_active == True,
@@ -190,16 +227,9 @@ def list_projects(
         status=project.status,
         archived_at=project.archived_at,
         delete_after=project.delete_after,
-        active_member_count=(
-            db.query(ProjectMember)
-            .filter(
-                ProjectMember.project_id == project.id,
-                ProjectMember.is_active == True
-            )
-            .count()
-        ),
+        active_member_count=active_member_count,
     )
-    for project, role in rows
+    for project, role, active_member_count in rows
 ]
 
 @router.post(
@@ -328,26 +358,7 @@ def get_project(
         db, project_id, current_user.id, allow_archived=True
     )
 
-    active_member_count = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project.id,
-            ProjectMember.is_active == True
-        )
-        .count()
-    )
-
-    return ProjectOut(
-        id=project.id,
-        name=project.name,
-        join_code=project.join_code,
-        sprint_duration=project.sprint_duration,
-        project_velocity=project.project_velocity,
-        status=project.status,
-        archived_at=project.archived_at,
-        delete_after=project.delete_after,
-        active_member_count=active_member_count,
-    )
+    return project_out(project, count_active_members(db, project.id))
 
 
 @router.patch("/{project_id}", response_model=ProjectOut)
@@ -364,7 +375,7 @@ def update_project(
     db.commit()
     db.refresh(project)
 
-    return project
+    return project_out(project, count_active_members(db, project.id))
 
 
 @router.patch("/{project_id}/velocity", response_model=ProjectOut)
@@ -384,7 +395,7 @@ def update_project_velocity(
     project.project_velocity = float(avg_velocity)
     db.commit()
     db.refresh(project)
-    return project
+    return project_out(project, count_active_members(db, project.id))
 
 
 @router.patch("/{project_id}/total_points", response_model=total_points)
@@ -482,6 +493,7 @@ def join_project(
     notify_added_to_project(db, current_user.id, project.name, data.role.value)
 
     db.commit()
+    invalidate_membership(project.id, current_user.id)
 
     return {
         "status": "ok",
@@ -545,6 +557,7 @@ def update_role(
 
     membership.role = data.role.value
     db.commit()
+    invalidate_membership(project_id, current_user.id)
     db.refresh(membership)
 
     return UpdateRoleOut(
@@ -561,28 +574,14 @@ def require_active_project_member(
     user_id: str,
     allow_archived: bool = False,
 ):
-    membership = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == user_id,
-            ProjectMember.is_active == True,
-        )
-        .first()
+    return require_project_member(
+        db,
+        project_id,
+        user_id,
+        active_only=True,
+        allow_archived=allow_archived,
     )
 
-    if not membership:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    if not allow_archived and project.status == "archived":
-        raise HTTPException(status_code=400, detail="Project is archived")
-
-    return membership, project
-
 
 @router.get("/{project_id}/board")
 def get_project_board(
@@ -703,6 +702,8 @@ def transfer_ownership(
     target_membership.role = "Product Owner"
 
     db.commit()
+    invalidate_membership(project_id, current_user.id)
+    invalidate_membership(project_id, data.new_owner_user_id)
 
     return TransferOwnershipOut(
         status="ok",
@@ -773,6 +774,7 @@ def leave_project(
         project.delete_after = now + timedelta(days=30)
 
     db.commit()
+    invalidate_membership(project_id, current_user.id)
 
     return {"status": "left_project"}
 
@@ -1,35 +1,34 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from uuid import UUID as PyUUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
+from app.core.config import EVENT_MAX_DURATION_DAYS, RECURRENCE_MAX_WINDOW_DAYS
 from app.core.deps import get_current_user
+from app.core.jwt import create_calendar_feed_token, verify_calendar_feed_token
 from app.db.session import get_db
 from app.models.project_event import ProjectEvent
-from app.models.project_members import ProjectMember
 from app.models.user import User
+from app.services.calendar_feed import bump_calendar_version, calendar_etag, etag_matches, stream_calendar
+from app.services.event_reminders import reminder_scheduler
+from app.services.membership import MembershipInfo, get_membership_info, require_project_member
+from app.services.recurrence import InvalidRecurrence, as_utc, expand_occurrences, validate_rrule
 from app.schemas.project_event import (
     ProjectEventCreate,
     ProjectEventOut,
     ProjectEventUpdate,
 )
-from app.services.notification_service import notify_event_created, notify_event_updated, notify_event_cancelled
+from app.services.notification_service import EVENT_CANCELLED, EVENT_CREATED, EVENT_UPDATED, notify_project
 from zoneinfo import ZoneInfo
 
 router = APIRouter(prefix="/projects", tags=["events"])
 
 
-def get_project_membership(project_id: PyUUID, user: User, db: Session) -> ProjectMember:
-    membership = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == user.id,
-        )
-        .first()
-    )
+def get_project_membership(project_id: PyUUID, user: User, db: Session) -> MembershipInfo:
+    membership = get_membership_info(db, project_id, user.id)
 
     if not membership:
         raise HTTPException(status_code=403, detail="Not a member of this project")
@@ -37,7 +36,7 @@ def get_project_membership(project_id: PyUUID, user: User, db: Session) -> Proje
     return membership
 
 
-def require_can_edit_events(project_id: PyUUID, user: User, db: Session) -> ProjectMember:
+def require_can_edit_events(project_id: PyUUID, user: User, db: Session) -> MembershipInfo:
     membership = get_project_membership(project_id, user, db)
 
     if membership.role not in {
@@ -51,6 +50,13 @@ def require_can_edit_events(project_id: PyUUID, user: User, db: Session) -> Proj
     return membership
 
 
+def check_rrule(rrule: str | None, start_at: datetime, tz_name: str | None) -> None:
+    try:
+        validate_rrule(rrule, start_at, tz_name)
+    except InvalidRecurrence as exc:
+        raise HTTPException(status_code=400, detail=f"Invalid rrule: {exc}")
+
+
 @router.get("/{project_id}/events", response_model=list[ProjectEventOut])
 def list_project_events(
     project_id: PyUUID,
@@ -64,23 +70,93 @@ def list_project_events(
 
     if end <= start:
         raise HTTPException(status_code=400, detail="end must be after start")
+    if end - start > timedelta(days=RECURRENCE_MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"Range may span at most {RECURRENCE_MAX_WINDOW_DAYS} days"
+        )
 
     filters = [
         ProjectEvent.project_id == project_id,
-        ProjectEvent.start_at < end,
-        ProjectEvent.end_at > start,
+        or_(
+            and_(
+                ProjectEvent.rrule == None,
+                ProjectEvent.start_at < end,
+                # lower bound from the max duration keeps the index scan to the window
+                ProjectEvent.start_at > start - timedelta(days=EVENT_MAX_DURATION_DAYS),
+                ProjectEvent.end_at > start,
+            ),
+            # a series that began before the window can still recur inside it
+            and_(ProjectEvent.rrule != None, ProjectEvent.start_at < end),
+        ),
     ]
 
     if not include_cancelled:
         filters.append(ProjectEvent.is_cancelled == False)
 
-    return (
+    events = (
         db.query(ProjectEvent)
         .filter(and_(*filters))
         .order_by(ProjectEvent.start_at.asc())
         .all()
     )
 
+    results = []
+    for event in events:
+        if not event.rrule:
+            results.append(ProjectEventOut.model_validate(event))
+            continue
+        try:
+            occurrences = expand_occurrences(event, start, end)
+        except InvalidRecurrence:
+            continue
+        base = ProjectEventOut.model_validate(event)
+        results.extend(
+            base.model_copy(
+                update={"start_at": occurrence_start, "end_at": occurrence_end, "occurrence_start": occurrence_start}
+            )
+            for occurrence_start, occurrence_end in occurrences
+        )
+
+    results.sort(key=lambda event: as_utc(event.start_at))
+    return results
+
+
+@router.post("/{project_id}/calendar-feed")
+def create_calendar_feed(
+    project_id: PyUUID,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    get_project_membership(project_id, user, db)
+    token = create_calendar_feed_token(user.id, project_id)
+    return {"token": token, "path": f"/projects/{project_id}/events.ics?token={token}"}
+
+
+@router.get("/{project_id}/events.ics")
+def get_calendar_feed(
+    project_id: PyUUID,
+    token: str = Query(...),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+):
+    user_id = verify_calendar_feed_token(token, project_id)
+    # membership is checked on every fetch so leaving a project revokes the feed
+    _, project = require_project_member(db, project_id, user_id)
+
+    etag = calendar_etag(db, project)
+    project_name = project.name
+    db.close()
+
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=300"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return StreamingResponse(
+        stream_calendar(project_id, project_name),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers,
+    )
+
 
 @router.post("/{project_id}/events", response_model=ProjectEventOut, status_code=201)
 def create_project_event(
@@ -90,6 +166,7 @@ def create_project_event(
     user: User = Depends(get_current_user),
 ):
     require_can_edit_events(project_id, user, db)
+    check_rrule(payload.rrule, payload.start_at, payload.timezone)
 
     event = ProjectEvent(
         project_id=project_id,
@@ -107,16 +184,16 @@ def create_project_event(
     db.add(event)
     db.flush()
 
-    members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
     event_tz = event.timezone or "UTC"
     local_start = event.start_at.astimezone(ZoneInfo(event_tz))
     start_str = local_start.strftime("%b %d, %I:%M %p")
 
-    for m in members:
-        notify_event_created(db, m.user_id, event.title, start_str)
+    notify_project(db, project_id, EVENT_CREATED, event_title=event.title, start_at=start_str)
+    bump_calendar_version(db, project_id)
 
     db.commit()
     db.refresh(event)
+    reminder_scheduler.event_changed(event)
     return event
 
 
@@ -149,18 +226,23 @@ def update_event(
 
     if new_end <= new_start:
         raise HTTPException(status_code=400, detail="end_at must be after start_at")
+    if new_end - new_start > timedelta(days=EVENT_MAX_DURATION_DAYS):
+        raise HTTPException(
+            status_code=400, detail=f"Events may last at most {EVENT_MAX_DURATION_DAYS} days"
+        )
+    check_rrule(data.get("rrule", event.rrule), new_start, data.get("timezone", event.timezone))
 
     for key, value in data.items():
         setattr(event, key, value)
 
     db.add(event)
 
-    members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
-    for m in members:
-        notify_event_updated(db, m.user_id, event.title)
+    notify_project(db, project_id, EVENT_UPDATED, event_title=event.title)
+    bump_calendar_version(db, project_id)
 
     db.commit()
     db.refresh(event)
+    reminder_scheduler.event_changed(event)
     return event
 
 @router.delete("/{project_id}/events/{event_id}", response_model=ProjectEventOut)
@@ -187,10 +269,10 @@ def cancel_event(
     event.is_cancelled = True
     db.add(event)
 
-    members = db.query(ProjectMember).filter(ProjectMember.project_id == project_id).all()
-    for m in members:
-        notify_event_cancelled(db, m.user_id, event.title)
+    notify_project(db, project_id, EVENT_CANCELLED, event_title=event.title)
+    bump_calendar_version(db, project_id)
 
     db.commit()
     db.refresh(event)
+    reminder_scheduler.event_changed(event)
     return event
\ No newline at end of file
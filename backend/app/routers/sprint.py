@@ -9,24 +9,18 @@ from app.core.deps import get_current_user
 from app.models import Story
 from app.models.user import User
 from app.models.sprint import Sprint
-from app.models.project import Project
 from app.schemas import StoryOut
-from app.schemas.sprint import SprintCreate, SprintUpdate, SprintOut, SprintBurndownOut
-from app.models.project_members import ProjectMember
+from app.schemas.sprint import SprintCreate, SprintUpdate, SprintOut, SprintBurndownOut, ProjectSprintBurndownOut
+from app.services.burndown import (
+    compute_full_burndown,
+    compute_project_burndowns,
+    compute_sprint_burndown,
+    empty_burndown,
+)
+from app.services.membership import check_project_member, require_project_member
 
 router = APIRouter(prefix="/sprints", tags=["sprints"])
 
-def require_project_member(db: Session, project_id: UUID, user_id: str) -> None:
-    pm = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == project_id,
-                ProjectMember.user_id == user_id)
-        .first()
-    )
-    if not pm:
-        raise HTTPException(status_code=404, detail="Project not found")
-    
-
 def dateHelper(start_date : date, sprint_duration):
     return start_date + timedelta(days=sprint_duration)
 
@@ -38,11 +32,7 @@ def create_sprint(
     current_user: User = Depends(get_current_user),
 ):
     # must be a member of the project
-    require_project_member(db, data.project_id, current_user.id)
-
-    project = db.query(Project).filter(Project.id == data.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    _, project = require_project_member(db, data.project_id, current_user.id)
     end_date = dateHelper(data.start_date, project.sprint_duration)
 
     if end_date < data.start_date:
@@ -70,6 +60,7 @@ def create_sprint(
         is_active=data.is_active,
         sprint_velocity=0,
     )
+    sprint.burndown_array = empty_burndown(sprint)
     db.add(sprint)
     db.commit()
     db.refresh(sprint)
@@ -84,11 +75,25 @@ def list_sprints(
 ):
     q = db.query(Sprint)
     if project_id:
-        require_project_member(db, project_id, current_user.id)
+        check_project_member(db, project_id, current_user.id)
         q = q.filter(Sprint.project_id == project_id)
     return q.all()
 
 
+@router.get("/burndowns", response_model=list[ProjectSprintBurndownOut])
+def list_project_burndowns(
+    project_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    check_project_member(db, project_id, current_user.id)
+
+    return [
+        {"sprint_id": sprint.id, "burndown_array": burndown}
+        for sprint, burndown in compute_project_burndowns(db, project_id)
+    ]
+
+
 @router.get("/{sprint_id}", response_model=SprintOut)
 def get_sprint(
     sprint_id: UUID,
@@ -98,7 +103,7 @@ def get_sprint(
     sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
     if not sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
-    require_project_member(db, sprint.project_id, current_user.id)
+    check_project_member(db, sprint.project_id, current_user.id)
     return sprint
 
 
@@ -112,7 +117,9 @@ def update_sprint(
     sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
     if not sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
-    require_project_member(db, sprint.project_id, current_user.id)
+    check_project_member(db, sprint.project_id, current_user.id)
+
+    old_dates = (sprint.start_date, sprint.end_date)
 
     if data.sprint_number is not None:
         sprint.sprint_number = data.sprint_number
@@ -142,6 +149,9 @@ def update_sprint(
     if sprint.end_date < sprint.start_date:
         raise HTTPException(status_code=400, detail="end_date must be >= start_date")
 
+    if (sprint.start_date, sprint.end_date) != old_dates:
+        sprint.burndown_array = compute_full_burndown(db, sprint)
+
     db.commit()
     db.refresh(sprint)
     return sprint
@@ -182,57 +192,9 @@ def get_sprint_burndown(
     if not sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
 
-    require_project_member(db, sprint.project_id, current_user.id)
-
-    sprint_days = (sprint.end_date - sprint.start_date).days + 1
-    final_array = [None] * sprint_days
-    today = date.today()
-    index_day = sprint.start_date
-
-
-    remaining_points = (
-        db.query(func.coalesce(func.sum(Story.points), 0))
-        .filter(
-            Story.sprint_id == sprint_id,
-            Story.date_added < index_day,
-        )
-        .scalar()
-    )
-
-    remaining_points = int(remaining_points)
-    for day in range(sprint_days):
-        if index_day > today:
-            break
-        added_points = (
-            db.query(func.coalesce(func.sum(Story.points), 0))
-            .filter(
-                Story.sprint_id == sprint_id,
-                Story.date_added == index_day,
-            )
-            .scalar()
-        )
-        remaining_points += added_points
-        
-        points_completed_that_day = (
-            db.query(func.coalesce(func.sum(Story.points), 0))
-            .filter(
-                Story.sprint_id == sprint_id,
-                Story.isDone == True,
-                Story.date_completed == index_day,
-            )
-            .scalar()
-        )
-        points_completed_that_day = int(points_completed_that_day)
-
-        remaining_points -= points_completed_that_day
-
-        final_array[day] = remaining_points
+    check_project_member(db, sprint.project_id, current_user.id)
 
-        index_day += timedelta(days=1)
-
-    sprint.burndown_array = final_array
-    db.commit()
-    db.refresh(sprint)
+    final_array = compute_sprint_burndown(db, sprint)
 
     return {
         "burndown_array": final_array
@@ -248,7 +210,7 @@ def get_sprint_stories_sorted_by_points(
     sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
     if not sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
-    require_project_member(db, sprint.project_id, current_user.id)
+    check_project_member(db, sprint.project_id, current_user.id)
 
 
     q = db.query(Story).filter(Story.sprint_id == sprint_id)
@@ -274,7 +236,7 @@ def delete_sprint(
     sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
     if not sprint:
         raise HTTPException(status_code=404, detail="Sprint not found")
-    require_project_member(db, sprint.project_id, current_user.id)
+    check_project_member(db, sprint.project_id, current_user.id)
 
     db.delete(sprint)
     db.commit()
@@ -1,52 +1,59 @@
+import base64
 from datetime import date
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query as OrmQuery, Session
 
 from app.core.deps import get_current_user
 from app.db.session import get_db
-from app.models.project import Project
-from app.models.project_members import ProjectMember
 from app.models.sprint import Sprint
 from app.models.story import Story
 from app.models.user import User
+from app.services.membership import check_project_member
+from app.services.backlog_rank import (
+    new_story_rank,
+    plan_reorder,
+    rank_between,
+    respace_backlog,
+    respace_project,
+    set_ranks,
+)
+from app.services.burndown import StoryState, apply_burndown_change, story_state
+from app.services.sprint_velocity import apply_velocity_change
 from app.schemas.story import (
     StoryCreate,
     StoryUpdate,
     StoryOut,
     StoryReorderRequest,
+    StoryMoveRequest,
     StoryPointsUpdate,
     StoryDateUpdate,
 )
 
 router = APIRouter(prefix="/stories", tags=["stories"])
 
-
-def require_project_member(db: Session, project_id: UUID, user_id: str) -> None:
-    pm = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == project_id, ProjectMember.user_id == user_id)
-        .first()
-    )
-    if not pm:
-        raise HTTPException(status_code=404, detail="Project not found")
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+STORY_FIELDS = tuple(StoryOut.model_fields)
 
 
-def recalculate_sprint_velocity(db: Session, sprint_id: UUID) -> None:
-    sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
-    if not sprint:
-        return
+def get_story_for_update(db: Session, story_id: UUID) -> Story:
+    # burndown and velocity deltas are computed from the story's state before
+    # the change, so concurrent writers to one story must be serialized
+    story = db.query(Story).filter(Story.id == story_id).with_for_update().first()
+    if not story:
+        raise HTTPException(status_code=404, detail="Story not found")
+    return story
 
-    velocity = (
-        db.query(func.coalesce(func.sum(Story.points), 0))
-        .filter(Story.sprint_id == sprint_id, Story.isDone == True)
-        .scalar()
-    )
 
-    sprint.sprint_velocity = int(velocity or 0)
+def apply_story_change(db: Session, before: StoryState | None, after: StoryState | None) -> None:
+    apply_burndown_change(db, before, after)
+    apply_velocity_change(db, before, after)
 
 
 @router.post("", response_model=StoryOut)
@@ -55,11 +62,7 @@ def create_story(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    require_project_member(db, data.project_id, current_user.id)
-
-    project = db.query(Project).filter(Project.id == data.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    check_project_member(db, data.project_id, current_user.id)
 
     if data.sprint_id is not None:
         sprint = db.query(Sprint).filter(Sprint.id == data.sprint_id).first()
@@ -75,14 +78,14 @@ def create_story(
         description=data.description,
         points=data.points,
         isDone=False,
-        priority=data.priority,
+        priority=new_story_rank(),
         date_added=date.today() if data.sprint_id is not None else None,
         date_completed=None,
     )
     db.add(story)
 
     if data.sprint_id is not None:
-        recalculate_sprint_velocity(db, data.sprint_id)
+        apply_story_change(db, None, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -95,11 +98,7 @@ def create_backlog_story(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    project = db.query(Project).filter(Project.id == data.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-    require_project_member(db, data.project_id, current_user.id)
+    check_project_member(db, data.project_id, current_user.id)
 
     if data.sprint_id is not None:
         raise HTTPException(
@@ -107,21 +106,13 @@ def create_backlog_story(
             detail="Backlog stories cannot be assigned to a sprint",
         )
 
-    max_priority = (
-      db.query(Story.priority)
-      .filter(Story.project_id == data.project_id, Story.sprint_id.is_(None))
-      .order_by(Story.priority.desc())
-      .first()
-    )
-    next_priority = max_priority[0] + 1 if max_priority else 1
-
     story = Story(
         project_id=data.project_id,
         sprint_id=None,
         title=data.title,
         description=data.description,
         points=data.points,
-        priority=next_priority,
+        priority=new_story_rank(),
         isDone=False,
         date_added=None,
         date_completed=None,
@@ -133,39 +124,108 @@ def create_backlog_story(
     return story
 
 
+def encode_story_cursor(priority: int, story_id: UUID) -> str:
+    raw = f"{priority}|{story_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_story_cursor(cursor: str) -> tuple[int, UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        priority, story_id = base64.urlsafe_b64decode(padded).decode().split("|")
+        return int(priority), UUID(story_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_story_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in STORY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    # id and priority are always returned so the caller can page and reorder
+    return list(dict.fromkeys(["id", "priority", *requested]))
+
+
+def story_page(
+    q: OrmQuery,
+    response: Response,
+    limit: int | None,
+    cursor: str | None,
+    fields: str | None,
+):
+    """Orders by (priority desc, id desc), optionally paged and projected.
+
+    Without limit the full list is returned as before; with it the cursor
+    for the next page is sent in the X-Next-Cursor header.
+    """
+    selected = parse_story_fields(fields)
+    if selected is not None:
+        q = q.with_entities(*[getattr(Story, field) for field in selected])
+
+    if cursor:
+        priority, story_id = decode_story_cursor(cursor)
+        q = q.filter(tuple_(Story.priority, Story.id) < tuple_(priority, story_id))
+
+    q = q.order_by(Story.priority.desc(), Story.id.desc())
+    rows = q.limit(limit + 1).all() if limit is not None else q.all()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_story_cursor(rows[-1].priority, rows[-1].id)
+
+    if selected is None:
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows
+
+    # partial rows cannot satisfy StoryOut, so they bypass the response model
+    page = JSONResponse(jsonable_encoder([dict(row._mapping) for row in rows]))
+    if next_cursor:
+        page.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return page
+
+
 @router.get("", response_model=list[StoryOut])
 def list_stories(
+    response: Response,
     project_id: UUID | None = None,
     sprint_id: UUID | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     if not project_id:
         raise HTTPException(status_code=400, detail="project_id is required")
 
-    require_project_member(db, project_id, current_user.id)
+    check_project_member(db, project_id, current_user.id)
 
     q = db.query(Story).filter(Story.project_id == project_id)
     if sprint_id is not None:
         q = q.filter(Story.sprint_id == sprint_id)
 
-    return q.order_by(Story.priority.desc()).all()
+    return story_page(q, response, limit, cursor, fields)
 
 
 @router.get("/backlog", response_model=list[StoryOut])
 def get_product_backlog(
+    response: Response,
     project_id: UUID,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: str | None = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    require_project_member(db, project_id, current_user.id)
+    check_project_member(db, project_id, current_user.id)
 
-    return (
-        db.query(Story)
-        .filter(Story.project_id == project_id, Story.sprint_id.is_(None))
-        .order_by(Story.priority.desc())
-        .all()
-    )
+    q = db.query(Story).filter(Story.project_id == project_id, Story.sprint_id.is_(None))
+    return story_page(q, response, limit, cursor, fields)
 
 
 @router.put("/backlog/reorder")
@@ -175,8 +235,9 @@ def reorder_backlog(
     current_user: User = Depends(get_current_user),
 ):
     stories = (
-        db.query(Story)
+        db.query(Story.id, Story.project_id, Story.priority)
         .filter(Story.id.in_(data.ordered_ids), Story.sprint_id.is_(None))
+        .order_by(Story.priority.desc(), Story.id.desc())
         .all()
     )
 
@@ -187,16 +248,131 @@ def reorder_backlog(
     if len(project_ids) != 1:
         raise HTTPException(status_code=400, detail="All backlog stories must belong to the same project")
 
-    require_project_member(db, list(project_ids)[0], current_user.id)
+    check_project_member(db, list(project_ids)[0], current_user.id)
 
-    story_map = {story.id: story for story in stories}
-    for index, story_id in enumerate(data.ordered_ids):
-        story_map[story_id].priority = len(data.ordered_ids) - index
+    # only stories whose relative position changed are rewritten
+    set_ranks(db, plan_reorder([(story.id, story.priority) for story in stories], data.ordered_ids))
 
     db.commit()
     return {"status": "success"}
 
 
+def _backlog_neighbour(db: Session, story: Story, anchor: Story, above: bool) -> Story | None:
+    q = db.query(Story).filter(
+        Story.project_id == anchor.project_id,
+        Story.sprint_id.is_(None),
+        Story.id != story.id,
+    )
+    if above:
+        return (
+            q.filter(tuple_(Story.priority, Story.id) > tuple_(anchor.priority, anchor.id))
+            .order_by(Story.priority.asc(), Story.id.asc())
+            .first()
+        )
+    return (
+        q.filter(tuple_(Story.priority, Story.id) < tuple_(anchor.priority, anchor.id))
+        .order_by(Story.priority.desc(), Story.id.desc())
+        .first()
+    )
+
+
+def _move_rank(db: Session, story: Story, above: Story | None, below: Story | None) -> int | None:
+    if above is not None and below is None:
+        below = _backlog_neighbour(db, story, above, above=False)
+    elif below is not None and above is None:
+        above = _backlog_neighbour(db, story, below, above=True)
+    return rank_between(
+        above.priority if above is not None else None,
+        below.priority if below is not None else None,
+    )
+
+
+def _rank_at(db: Session, story: Story, position: int) -> int | None:
+    others = (
+        db.query(Story.priority)
+        .filter(Story.project_id == story.project_id, Story.id != story.id)
+        .order_by(Story.priority.desc(), Story.id.desc())
+    )
+    if position <= 1:
+        below = others.first()
+        return rank_between(None, below.priority if below is not None else None)
+
+    neighbours = others.offset(position - 2).limit(2).all()
+    if not neighbours:
+        # past the end of the list: below the lowest story
+        lowest = others.order_by(None).order_by(Story.priority.asc(), Story.id.asc()).first()
+        return rank_between(lowest.priority if lowest is not None else None, None)
+    return rank_between(
+        neighbours[0].priority,
+        neighbours[1].priority if len(neighbours) > 1 else None,
+    )
+
+
+def _position_rank(db: Session, story: Story, position: int) -> int:
+    """Maps a client-supplied priority to a rank.
+
+    The frontend PATCHes priority as the story's 1-based place in
+    GET /stories?project_id=..., top first, so it is placed between the
+    stories at that position rather than stored as is.
+    """
+    rank = _rank_at(db, story, position)
+    if rank is None:
+        respace_project(db, story.project_id)
+        rank = _rank_at(db, story, position)
+    return rank
+
+
+@router.put("/backlog/{story_id}/move", response_model=StoryOut)
+def move_backlog_story(
+    story_id: UUID,
+    data: StoryMoveRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if data.above_id is None and data.below_id is None:
+        raise HTTPException(status_code=400, detail="above_id or below_id is required")
+
+    story = db.query(Story).filter(Story.id == story_id, Story.sprint_id.is_(None)).first()
+    if not story:
+        raise HTTPException(status_code=404, detail="Story not found")
+
+    check_project_member(db, story.project_id, current_user.id)
+
+    neighbours = {}
+    for key, neighbour_id in (("above", data.above_id), ("below", data.below_id)):
+        if neighbour_id is None:
+            continue
+        neighbour = (
+            db.query(Story)
+            .filter(
+                Story.id == neighbour_id,
+                Story.project_id == story.project_id,
+                Story.sprint_id.is_(None),
+                Story.id != story.id,
+            )
+            .first()
+        )
+        if not neighbour:
+            raise HTTPException(status_code=400, detail="Invalid story IDs")
+        neighbours[key] = neighbour
+
+    above, below = neighbours.get("above"), neighbours.get("below")
+    rank = _move_rank(db, story, above, below)
+    if rank is None:
+        # the gap is used up; respace this backlog once and retry
+        respace_backlog(db, story.project_id)
+        db.flush()
+        db.expire_all()
+        rank = _move_rank(db, story, above, below)
+        if rank is None:
+            raise HTTPException(status_code=400, detail="above_id must rank above below_id")
+
+    story.priority = rank
+    db.commit()
+    db.refresh(story)
+    return story
+
+
 @router.get("/{story_id}", response_model=StoryOut)
 def get_story(
     story_id: UUID,
@@ -207,7 +383,7 @@ def get_story(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
     return story
 
 
@@ -218,14 +394,17 @@ def update_story(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
     update_payload = data.model_dump(exclude_unset=True)
     old_sprint_id = story.sprint_id
+    before = story_state(story)
+
+    position = update_payload.pop("priority", None)
+    if position is not None:
+        story.priority = _position_rank(db, story, position)
 
     if "sprint_id" in update_payload and update_payload["sprint_id"] is not None:
         sprint = db.query(Sprint).filter(Sprint.id == update_payload["sprint_id"]).first()
@@ -262,15 +441,7 @@ def update_story(
     if "date_completed" in update_payload:
         story.isDone = story.date_completed is not None
 
-    affected_sprint_ids = set()
-    if old_sprint_id is not None:
-        affected_sprint_ids.add(old_sprint_id)
-    if story.sprint_id is not None:
-        affected_sprint_ids.add(story.sprint_id)
-
-    if any(key in update_payload for key in ["points", "sprint_id", "isDone", "date_completed"]):
-        for sid in affected_sprint_ids:
-            recalculate_sprint_velocity(db, sid)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -285,11 +456,9 @@ def assign_story_to_sprint(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
     sprint = db.query(Sprint).filter(Sprint.id == sprint_id).first()
     if not sprint:
@@ -305,16 +474,14 @@ def assign_story_to_sprint(
         except Exception:
             raise HTTPException(status_code=400, detail="date_added must be YYYY-MM-DD")
 
-    old_sprint_id = story.sprint_id
+    before = story_state(story)
 
     story.sprint_id = sprint_id
     story.date_added = date_added_value or date.today()
     story.date_completed = None
     story.isDone = False
 
-    if old_sprint_id is not None:
-        recalculate_sprint_velocity(db, old_sprint_id)
-    recalculate_sprint_velocity(db, sprint_id)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -327,20 +494,17 @@ def unassign_story_from_sprint(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
-    old_sprint_id = story.sprint_id
+    before = story_state(story)
     story.sprint_id = None
     story.date_added = None
     story.date_completed = None
     story.isDone = False
 
-    if old_sprint_id is not None:
-        recalculate_sprint_velocity(db, old_sprint_id)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -353,13 +517,11 @@ def toggle_story_done(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
-    sprint_id = story.sprint_id
+    before = story_state(story)
 
     if story.isDone:
         story.isDone = False
@@ -368,8 +530,7 @@ def toggle_story_done(
         story.isDone = True
         story.date_completed = date.today()
 
-    if sprint_id is not None:
-        recalculate_sprint_velocity(db, sprint_id)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -383,16 +544,13 @@ def update_story_points(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
+    before = story_state(story)
     story.points = data.points
-
-    if story.sprint_id is not None:
-        recalculate_sprint_velocity(db, story.sprint_id)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -406,17 +564,14 @@ def update_story_date_completed(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
+    before = story_state(story)
     story.date_completed = data.date_completed
     story.isDone = data.date_completed is not None
-
-    if story.sprint_id is not None:
-        recalculate_sprint_velocity(db, story.sprint_id)
+    apply_story_change(db, before, story_state(story))
 
     db.commit()
     db.refresh(story)
@@ -429,17 +584,13 @@ def delete_story(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(status_code=404, detail="Story not found")
+    story = get_story_for_update(db, story_id)
 
-    require_project_member(db, story.project_id, current_user.id)
-    old_sprint_id = story.sprint_id
+    check_project_member(db, story.project_id, current_user.id)
+    before = story_state(story)
 
     db.delete(story)
-
-    if old_sprint_id is not None:
-        recalculate_sprint_velocity(db, old_sprint_id)
+    apply_story_change(db, before, None)
 
     db.commit()
     return {"status": "ok"}
\ No newline at end of file
@@ -9,31 +9,21 @@ from app.models.user import User
 from app.models.task import Task
 from app.models.story import Story
 from app.schemas import TaskOut, TaskCreate, TaskUpdate
-from app.models.project_members import ProjectMember
+from app.models.project import Project
+from app.services.membership import check_project_member, require_project_member
 from app.schemas.task import TaskDateUpdate
 from app.services.notification_service import (
+    TASK_DELETED,
+    TASK_STATUS_CHANGED,
     notify_task_assigned,
-    notify_task_status_changed,
-    notify_task_deleted,
+    notify_project,
+    task_status_label,
+    task_status_subject,
 )
-from app.models.project import Project
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-def require_project_member(db: Session, project_id: UUID, user_id: str) -> None:
-    pm = (
-        db.query(ProjectMember)
-        .filter(
-            ProjectMember.project_id == project_id,
-            ProjectMember.user_id == str(user_id),
-        )
-        .first()
-    )
-    if not pm:
-        raise HTTPException(status_code=404, detail="Project not found")
-
-
 @router.post("", response_model=TaskOut)
 def create_task(
     data: TaskCreate,
@@ -44,7 +34,7 @@ def create_task(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    _, project = require_project_member(db, story.project_id, current_user.id)
 
     task = Task(
         story_id=data.story_id,
@@ -61,8 +51,7 @@ def create_task(
 
     if task.assignee_id:
         assignee = db.query(User).filter(User.id == str(task.assignee_id)).first()
-        project = db.query(Project).filter(Project.id == story.project_id).first()
-        if assignee and project:
+        if assignee:
             notify_task_assigned(db, assignee.id, task.title, project.name)
 
     db.commit()
@@ -83,7 +72,7 @@ def list_tasks(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
 
     return db.query(Task).filter(Task.story_id == story_id).all()
 
@@ -102,7 +91,7 @@ def get_task(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
     return task
 
 
@@ -121,11 +110,7 @@ def update_task(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
-
-    project = db.query(Project).filter(Project.id == story.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    check_project_member(db, story.project_id, current_user.id)
 
     update_data = data.model_dump(exclude_unset=True)
 
@@ -141,20 +126,20 @@ def update_task(
 
     if "assignee_id" in update_data and task.assignee_id:
         assignee = db.query(User).filter(User.id == str(task.assignee_id)).first()
-        if assignee:
+        project = db.query(Project).filter(Project.id == story.project_id).first()
+        if assignee and project:
             notify_task_assigned(db, assignee.id, task.title, project.name)
 
     if "status" in update_data and task.status != old_status:
-        if task.assignee_id:
-            notify_task_status_changed(db, task.assignee_id, task.title, task.status)
-
-        members = db.query(ProjectMember).filter(
-            ProjectMember.project_id == story.project_id
-        ).all()
-
-        for m in members:
-            if str(m.user_id) != str(task.assignee_id):
-                notify_task_status_changed(db, str(m.user_id), task.title, task.status)
+        notify_project(
+            db,
+            story.project_id,
+            TASK_STATUS_CHANGED,
+            also_notify=[task.assignee_id],
+            subject=task_status_subject(task.id),
+            task_title=task.title,
+            label=task_status_label(task.status),
+        )
 
     db.commit()
     db.refresh(task)
@@ -175,7 +160,7 @@ def set_task_completed_date(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
     task.date_completed = date.today()
 
     db.commit()
@@ -198,7 +183,7 @@ def update_task_completed_date(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
+    check_project_member(db, story.project_id, current_user.id)
     task.date_completed = data.date_completed
 
     db.commit()
@@ -220,25 +205,14 @@ def delete_task(
     if not story:
         raise HTTPException(status_code=404, detail="Story not found")
 
-    require_project_member(db, story.project_id, current_user.id)
-
-    project = db.query(Project).filter(Project.id == story.project_id).first()
-    if not project:
-        raise HTTPException(status_code=404, detail="Project not found")
+    _, project = require_project_member(db, story.project_id, current_user.id)
 
     task_title = task.title
     project_name = project.name
 
-    members = (
-        db.query(ProjectMember)
-        .filter(ProjectMember.project_id == story.project_id)
-        .all()
-    )
-
     db.delete(task)
 
-    for m in members:
-        notify_task_deleted(db, str(m.user_id), task_title, project_name)
+    notify_project(db, story.project_id, TASK_DELETED, task_title=task_title, project_name=project_name)
 
     db.commit()
     return {"status": "ok"}
@@ -1,8 +1,10 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Literal
 from pydantic import BaseModel, Field, model_validator
 from uuid import UUID as PyUUID
 
+from app.core.config import EVENT_MAX_DURATION_DAYS
+
 EventType = Literal[
     "daily_scrum",
     "sprint_planning",
@@ -29,6 +31,8 @@ class ProjectEventCreate(BaseModel):
     def validate_range(self):
         if self.end_at <= self.start_at:
             raise ValueError("end_at must be after start_at")
+        if self.end_at - self.start_at > timedelta(days=EVENT_MAX_DURATION_DAYS):
+            raise ValueError(f"Events may last at most {EVENT_MAX_DURATION_DAYS} days")
         return self
     
 
@@ -49,6 +53,8 @@ class ProjectEventUpdate(BaseModel):
         if self.start_at is not None and self.end_at is not None:
             if self.end_at <= self.start_at:
                 raise ValueError("end_at must be after start_at")
+            if self.end_at - self.start_at > timedelta(days=EVENT_MAX_DURATION_DAYS):
+                raise ValueError(f"Events may last at most {EVENT_MAX_DURATION_DAYS} days")
         return self
     
 
@@ -68,6 +74,9 @@ class ProjectEventOut(BaseModel):
     rrule: Optional[str] = None
 
     is_cancelled: bool
+    # set on expanded occurrences of a recurring event; start_at/end_at then
+    # hold that occurrence's times rather than the series start
+    occurrence_start: Optional[datetime] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
@@ -20,6 +20,11 @@ class SprintBurndownOut(BaseModel):
     burndown_array: list[float | None]
 
 
+class ProjectSprintBurndownOut(BaseModel):
+    sprint_id: UUID
+    burndown_array: list[float | None]
+
+
 class SprintOut(BaseModel):
     id: UUID
     sprint_number: int
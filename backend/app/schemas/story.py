@@ -51,5 +51,12 @@ class StoryReorderRequest(BaseModel):
     ordered_ids: list[UUID]
 
 
+class StoryMoveRequest(BaseModel):
+    # the backlog neighbours the story should end up between; either may be
+    # omitted to move it to the top or bottom
+    above_id: UUID | None = None
+    below_id: UUID | None = None
+
+
 class StoryPointsUpdate(BaseModel):
     points: int = Field(ge=0)
\ No newline at end of file
@@ -0,0 +1,185 @@
+import bisect
+import logging
+import time
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.story import Story
+
+logger = logging.getLogger(__name__)
+
+# Story.priority is a sparse rank, higher first. Moves take the midpoint of
+# their new neighbours, so only the moved row is written; a backlog is
+# respaced when some gap has shrunk below REBALANCE_MIN_GAP.
+RANK_STEP = 1 << 20
+REBALANCE_MIN_GAP = 16
+
+
+def new_story_rank() -> int:
+    # microseconds since the epoch: above every respaced rank, and later
+    # stories land above earlier ones without a max(priority) query
+    return time.time_ns() // 1000
+
+
+def rank_between(upper: int | None, lower: int | None) -> int | None:
+    """Returns a rank strictly between two neighbours, or None if there is no room."""
+    if upper is None and lower is None:
+        return new_story_rank()
+    if upper is None:
+        return lower + RANK_STEP
+    if lower is None:
+        return upper - RANK_STEP
+    if upper - lower < 2:
+        return None
+    return lower + (upper - lower) // 2
+
+
+def _kept_positions(sequence: list[int]) -> set[int]:
+    """Indexes of a longest increasing subsequence of sequence."""
+    tails = []
+    tail_indexes = []
+    previous = [-1] * len(sequence)
+    for index, value in enumerate(sequence):
+        slot = bisect.bisect_left(tails, value)
+        if slot == len(tails):
+            tails.append(value)
+            tail_indexes.append(index)
+        else:
+            tails[slot] = value
+            tail_indexes[slot] = index
+        previous[index] = tail_indexes[slot - 1] if slot else -1
+
+    kept = set()
+    index = tail_indexes[-1] if tail_indexes else -1
+    while index != -1:
+        kept.add(index)
+        index = previous[index]
+    return kept
+
+
+def _spread(upper: int | None, lower: int | None, count: int) -> list[int] | None:
+    if upper is not None and lower is not None:
+        step = (upper - lower) // (count + 1)
+        if step < 1:
+            return None
+        return [upper - step * (offset + 1) for offset in range(count)]
+    if upper is not None:
+        return [upper - RANK_STEP * (offset + 1) for offset in range(count)]
+    if lower is not None:
+        return [lower + RANK_STEP * (count - offset) for offset in range(count)]
+    return [RANK_STEP * (count - offset) for offset in range(count)]
+
+
+def plan_reorder(current: list[tuple[UUID, int]], ordered_ids: list[UUID]) -> dict[UUID, int]:
+    """New ranks for the stories whose position changed.
+
+    current is the stories' present order, highest rank first. Stories on a
+    longest run that already appears in the requested order keep their rank;
+    the others are spread between their kept neighbours. If some gap is too
+    narrow every story gets a fresh, evenly spaced rank.
+    """
+    ranks = dict(current)
+    position = {story_id: index for index, (story_id, _) in enumerate(current)}
+    kept = _kept_positions([position[story_id] for story_id in ordered_ids])
+
+    changes = {}
+    upper = None
+    run = []
+    for index, story_id in enumerate([*ordered_ids, None]):
+        if story_id is not None and index not in kept:
+            run.append(story_id)
+            continue
+
+        lower = ranks[story_id] if story_id is not None else None
+        if run:
+            spread = _spread(upper, lower, len(run))
+            if spread is None:
+                return {
+                    story_id: RANK_STEP * (len(ordered_ids) - offset)
+                    for offset, story_id in enumerate(ordered_ids)
+                }
+            changes.update(zip(run, spread))
+            run = []
+        upper = lower
+    return changes
+
+
+def set_ranks(db: Session, ranks: dict[UUID, int]) -> None:
+    if ranks:
+        db.execute(
+            update(Story),
+            [{"id": story_id, "priority": rank} for story_id, rank in ranks.items()],
+        )
+
+
+def respace_backlog(db: Session, project_id: UUID) -> int:
+    return _respace(db, Story.project_id == project_id, Story.sprint_id.is_(None))
+
+
+def respace_project(db: Session, project_id: UUID) -> int:
+    # every story in the project, sprint stories included, keeping their order
+    return _respace(db, Story.project_id == project_id)
+
+
+def _respace(db: Session, *criteria) -> int:
+    story_ids = [
+        story_id
+        for (story_id,) in db.query(Story.id)
+        .filter(*criteria)
+        .order_by(Story.priority.desc(), Story.id.desc())
+        .with_for_update()
+        .all()
+    ]
+    set_ranks(
+        db,
+        {story_id: RANK_STEP * (len(story_ids) - index) for index, story_id in enumerate(story_ids)},
+    )
+    return len(story_ids)
+
+
+def crowded_backlogs(db: Session, min_gap: int = REBALANCE_MIN_GAP) -> list[UUID]:
+    gaps = (
+        db.query(
+            Story.project_id.label("project_id"),
+            (
+                func.lag(Story.priority).over(
+                    partition_by=Story.project_id,
+                    order_by=(Story.priority.desc(), Story.id.desc()),
+                )
+                - Story.priority
+            ).label("gap"),
+        )
+        .filter(Story.sprint_id.is_(None))
+        .subquery()
+    )
+    return [
+        project_id
+        for (project_id,) in db.query(gaps.c.project_id)
+        .group_by(gaps.c.project_id)
+        .having(func.min(gaps.c.gap) < min_gap)
+        .all()
+    ]
+
+
+def rebalance_backlogs(db: Session) -> int:
+    project_ids = crowded_backlogs(db)
+    for project_id in project_ids:
+        respace_backlog(db, project_id)
+        db.commit()
+    return len(project_ids)
+
+
+def run_backlog_rebalance():
+    db: Session = SessionLocal()
+    try:
+        rebalanced = rebalance_backlogs(db)
+        if rebalanced:
+            logger.info("Respaced backlog ranks for %s project(s)", rebalanced)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
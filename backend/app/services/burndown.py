@@ -0,0 +1,188 @@
+from collections import defaultdict
+from datetime import date
+from typing import NamedTuple
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.sprint import Sprint
+from app.models.story import Story
+
+
+# Sprint.burndown_array is maintained incrementally by the story mutation
+# paths. It holds the opening balance (points added before start_date)
+# followed by the remaining points at the end of every sprint day, including
+# days that have not happened yet; readers mask the future days with None.
+
+
+class StoryState(NamedTuple):
+    sprint_id: UUID | None
+    points: int
+    date_added: date | None
+    date_completed: date | None
+    is_done: bool
+
+
+def story_state(story: Story | None) -> StoryState | None:
+    if story is None:
+        return None
+    return StoryState(
+        sprint_id=story.sprint_id,
+        points=int(story.points or 0),
+        date_added=story.date_added,
+        date_completed=story.date_completed,
+        is_done=bool(story.isDone),
+    )
+
+
+def sprint_length(sprint: Sprint) -> int:
+    return (sprint.end_date - sprint.start_date).days + 1
+
+
+def empty_burndown(sprint: Sprint) -> list:
+    return [0.0] * (max(sprint_length(sprint), 0) + 1)
+
+
+def is_burndown_current(sprint: Sprint) -> bool:
+    stored = sprint.burndown_array
+    return (
+        stored is not None
+        and len(stored) == max(sprint_length(sprint), 0) + 1
+        and None not in stored
+    )
+
+
+def _story_point_buckets(db: Session, sprint_ids: list[UUID]) -> dict:
+    # One grouped aggregate for every requested sprint: points per
+    # (sprint, date_added, date_completed, isDone) bucket.
+    rows = (
+        db.query(
+            Story.sprint_id,
+            Story.date_added,
+            Story.date_completed,
+            Story.isDone,
+            func.coalesce(func.sum(Story.points), 0),
+        )
+        .filter(Story.sprint_id.in_(sprint_ids))
+        .group_by(Story.sprint_id, Story.date_added, Story.date_completed, Story.isDone)
+        .all()
+    )
+
+    buckets = defaultdict(list)
+    for sprint_id, date_added, date_completed, is_done, points in rows:
+        buckets[sprint_id].append(
+            StoryState(sprint_id, int(points), date_added, date_completed, bool(is_done))
+        )
+    return buckets
+
+
+def _apply_state(sprint: Sprint, burndown: list, state: StoryState, sign: int) -> None:
+    days = len(burndown) - 1
+    points = sign * state.points
+    if not points:
+        return
+
+    if state.date_added is not None and state.date_added <= sprint.end_date:
+        first = max((state.date_added - sprint.start_date).days + 1, 0)
+        for index in range(first, days + 1):
+            burndown[index] += points
+
+    if state.is_done and state.date_completed is not None:
+        if sprint.start_date <= state.date_completed <= sprint.end_date:
+            first = (state.date_completed - sprint.start_date).days + 1
+            for index in range(first, days + 1):
+                burndown[index] -= points
+
+
+def build_full_burndown(sprint: Sprint, states: list[StoryState]) -> list:
+    burndown = empty_burndown(sprint)
+    for state in states:
+        _apply_state(sprint, burndown, state, 1)
+    return burndown
+
+
+def visible_burndown(sprint: Sprint, burndown: list, today: date | None = None) -> list:
+    today = today or date.today()
+    days = burndown[1:]
+    days_elapsed = max(min(len(days), (today - sprint.start_date).days + 1), 0)
+    return days[:days_elapsed] + [None] * (len(days) - days_elapsed)
+
+
+def build_burndown(sprint: Sprint, states: list[StoryState], today: date | None = None) -> list:
+    return visible_burndown(sprint, build_full_burndown(sprint, states), today)
+
+
+def compute_full_burndown(db: Session, sprint: Sprint) -> list:
+    buckets = _story_point_buckets(db, [sprint.id])
+    return build_full_burndown(sprint, buckets.get(sprint.id, []))
+
+
+def compute_sprint_burndown(db: Session, sprint: Sprint, today: date | None = None) -> list:
+    if is_burndown_current(sprint):
+        return visible_burndown(sprint, list(sprint.burndown_array), today)
+    return visible_burndown(sprint, compute_full_burndown(db, sprint), today)
+
+
+def compute_project_burndowns(
+    db: Session, project_id: UUID, today: date | None = None
+) -> list[tuple[Sprint, list]]:
+    sprints = (
+        db.query(Sprint)
+        .filter(Sprint.project_id == project_id)
+        .order_by(Sprint.sprint_number.asc())
+        .all()
+    )
+
+    stale_ids = {sprint.id for sprint in sprints if not is_burndown_current(sprint)}
+    buckets = _story_point_buckets(db, list(stale_ids)) if stale_ids else {}
+
+    results = []
+    for sprint in sprints:
+        if sprint.id in stale_ids:
+            burndown = build_full_burndown(sprint, buckets.get(sprint.id, []))
+        else:
+            burndown = list(sprint.burndown_array)
+        results.append((sprint, visible_burndown(sprint, burndown, today)))
+    return results
+
+
+def apply_burndown_change(
+    db: Session, before: StoryState | None, after: StoryState | None
+) -> None:
+    if before == after:
+        return
+
+    sprint_ids = {
+        state.sprint_id
+        for state in (before, after)
+        if state is not None and state.sprint_id is not None
+    }
+
+    # sorted so two stories moving between the same sprints lock them in one order
+    for sprint_id in sorted(sprint_ids, key=str):
+        # populate_existing: the caller may already hold this sprint unlocked,
+        # and the delta must be applied to the row as it is once locked
+        sprint = (
+            db.query(Sprint)
+            .filter(Sprint.id == sprint_id)
+            .with_for_update()
+            .populate_existing()
+            .first()
+        )
+        if not sprint:
+            continue
+
+        if not is_burndown_current(sprint):
+            # Sprints created before incremental maintenance are rebuilt once
+            # from the story table, which must already hold the new state.
+            db.flush()
+            sprint.burndown_array = compute_full_burndown(db, sprint)
+            continue
+
+        burndown = list(sprint.burndown_array)
+        if before is not None and before.sprint_id == sprint_id:
+            _apply_state(sprint, burndown, before, -1)
+        if after is not None and after.sprint_id == sprint_id:
+            _apply_state(sprint, burndown, after, 1)
+        sprint.burndown_array = burndown
@@ -0,0 +1,252 @@
+import zlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.project import Project
+from app.models.project_event import ProjectCalendarVersion, ProjectEvent
+from app.services.recurrence import as_utc
+
+FEED_BATCH_SIZE = 500
+# VTIMEZONE components list a zone's transitions up to this many years
+# ahead; past the last one clients keep its offset
+TIMEZONE_YEARS_AHEAD = 20
+
+
+def bump_calendar_version(db: Session, project_id) -> None:
+    stmt = insert(ProjectCalendarVersion).values(project_id=project_id, version=1)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ProjectCalendarVersion.project_id],
+            set_={"version": ProjectCalendarVersion.version + 1},
+        )
+    )
+
+
+def calendar_etag(db: Session, project: Project) -> str:
+    version = (
+        db.query(ProjectCalendarVersion.version)
+        .filter(ProjectCalendarVersion.project_id == project.id)
+        .scalar()
+    ) or 0
+    # the project name is the calendar's display name, so it is part of the tag
+    return f'"{project.id}-{version}-{zlib.crc32(project.name.encode()):08x}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold_line(line: str) -> str:
+    # RFC 5545: lines are at most 75 octets, continued with CRLF + space
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # never split inside a multi-byte character
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start = end
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_utc(value: datetime) -> str:
+    return as_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _format_offset(offset: timedelta) -> str:
+    seconds = int(offset.total_seconds())
+    sign = "-" if seconds < 0 else "+"
+    hours, rest = divmod(abs(seconds), 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{sign}{hours:02d}{minutes:02d}" + (f"{seconds:02d}" if seconds else "")
+
+
+def _transitions(zone: ZoneInfo, start: datetime, end: datetime):
+    """Yields (utc instant, offset before, offset after) for each change in [start, end)."""
+    day = timedelta(days=1)
+    current = start
+    offset = current.astimezone(zone).utcoffset()
+    while current < end:
+        following = current + day
+        next_offset = following.astimezone(zone).utcoffset()
+        if next_offset != offset:
+            low, high = int(current.timestamp()), int(following.timestamp())
+            while high - low > 1:
+                middle = (low + high) // 2
+                if datetime.fromtimestamp(middle, timezone.utc).astimezone(zone).utcoffset() == offset:
+                    low = middle
+                else:
+                    high = middle
+            yield datetime.fromtimestamp(high, timezone.utc), offset, next_offset
+            offset = next_offset
+        current = following
+
+
+def _observance(zone: ZoneInfo, at: datetime, offset_from: timedelta) -> list[str]:
+    local = at.astimezone(zone)
+    kind = "DAYLIGHT" if local.dst() else "STANDARD"
+    return [
+        f"BEGIN:{kind}",
+        # DTSTART is the local time the observance begins, in the old offset
+        f"DTSTART:{(at + offset_from).strftime('%Y%m%dT%H%M%S')}",
+        f"TZOFFSETFROM:{_format_offset(offset_from)}",
+        f"TZOFFSETTO:{_format_offset(local.utcoffset())}",
+        f"TZNAME:{escape_text(local.tzname())}",
+        f"END:{kind}",
+    ]
+
+
+@lru_cache(maxsize=256)
+def vtimezone_lines(tz_name: str, first_year: int, last_year: int) -> tuple[str, ...]:
+    """VTIMEZONE for tz_name (RFC 5545 3.6.5), with every transition from first_year to last_year."""
+    zone = ZoneInfo(tz_name)
+    start = datetime(first_year, 1, 1, tzinfo=zone).astimezone(timezone.utc)
+    end = datetime(last_year + 1, 1, 1, tzinfo=timezone.utc)
+    lines = ["BEGIN:VTIMEZONE", f"TZID:{tz_name}"]
+    # the observance in force when the earliest event starts
+    lines.extend(_observance(zone, start, start.astimezone(zone).utcoffset()))
+    for at, offset_from, _ in _transitions(zone, start, end):
+        lines.extend(_observance(zone, at, offset_from))
+    lines.append("END:VTIMEZONE")
+    return tuple(lines)
+
+
+def _feed_zones(db: Session, project_id) -> list[str]:
+    # only recurring events are written with TZID, see _timestamp_lines
+    last_year = datetime.now(timezone.utc).year + TIMEZONE_YEARS_AHEAD
+    lines = []
+    for tz_name, first_start in (
+        db.query(ProjectEvent.timezone, func.min(ProjectEvent.start_at))
+        .filter(
+            ProjectEvent.project_id == project_id,
+            ProjectEvent.rrule != None,
+            ProjectEvent.timezone != None,
+        )
+        .group_by(ProjectEvent.timezone)
+        .order_by(ProjectEvent.timezone)
+    ):
+        try:
+            lines.extend(vtimezone_lines(tz_name, as_utc(first_start).year - 1, last_year))
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    return lines
+
+
+def _timestamp_lines(event: ProjectEvent) -> list[str]:
+    if event.rrule and event.timezone:
+        # recurring events keep their wall-clock time, so they are written
+        # in the event's zone rather than UTC
+        try:
+            zone = ZoneInfo(event.timezone)
+        except ZoneInfoNotFoundError:
+            zone = None
+        if zone is not None:
+            start = as_utc(event.start_at).astimezone(zone)
+            end = as_utc(event.end_at).astimezone(zone)
+            return [
+                f"DTSTART;TZID={event.timezone}:{start.strftime('%Y%m%dT%H%M%S')}",
+                f"DTEND;TZID={event.timezone}:{end.strftime('%Y%m%dT%H%M%S')}",
+            ]
+    return [f"DTSTART:{format_utc(event.start_at)}", f"DTEND:{format_utc(event.end_at)}"]
+
+
+def _rrule_lines(rrule: str) -> list[str]:
+    lines = []
+    for line in rrule.replace("\r\n", "\n").split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        # the VEVENT already has its own DTSTART
+        if line.upper().startswith(("DTSTART:", "DTSTART;")):
+            continue
+        if ":" not in line.split(";", 1)[0]:
+            line = f"RRULE:{line}"
+        lines.append(line)
+    return lines
+
+
+def render_event(event: ProjectEvent, stamp: str) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event.id}@sprintwheel",
+        f"DTSTAMP:{stamp}",
+        *_timestamp_lines(event),
+        f"SUMMARY:{escape_text(event.title)}",
+        f"CATEGORIES:{escape_text(event.type)}",
+    ]
+    if event.description:
+        lines.append(f"DESCRIPTION:{escape_text(event.description)}")
+    if event.location:
+        lines.append(f"LOCATION:{escape_text(event.location)}")
+    if event.rrule:
+        lines.extend(_rrule_lines(event.rrule))
+    lines.append("STATUS:CANCELLED" if event.is_cancelled else "STATUS:CONFIRMED")
+    lines.append("END:VEVENT")
+    return "".join(fold_line(line) for line in lines)
+
+
+def stream_calendar(project_id, calendar_name: str):
+    """Yields the feed chunk by chunk from a server-side cursor.
+
+    Opens its own session because the request's session is closed before
+    the response starts streaming.
+    """
+    stamp = format_utc(datetime.now(timezone.utc))
+    db: Session = SessionLocal()
+    try:
+        yield "".join(
+            fold_line(line)
+            for line in (
+                "BEGIN:VCALENDAR",
+                "VERSION:2.0",
+                "PRODID:-//SprintWheel//Project Calendar//EN",
+                "CALSCALE:GREGORIAN",
+                f"X-WR-CALNAME:{escape_text(calendar_name)}",
+                *_feed_zones(db, project_id),
+            )
+        )
+
+        events = (
+            db.query(ProjectEvent)
+            .filter(ProjectEvent.project_id == project_id)
+            .order_by(ProjectEvent.start_at.asc())
+            .yield_per(FEED_BATCH_SIZE)
+        )
+        chunk = []
+        for event in events:
+            chunk.append(render_event(event, stamp))
+            if len(chunk) >= FEED_BATCH_SIZE:
+                yield "".join(chunk)
+                chunk = []
+        if chunk:
+            yield "".join(chunk)
+    finally:
+        db.close()
+
+    yield fold_line("END:VCALENDAR")
@@ -0,0 +1,211 @@
+import heapq
+import itertools
+import logging
+import os
+import queue
+import smtplib
+import threading
+import time
+from dataclasses import dataclass
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SmtpSettings:
+    host: str | None
+    port: int
+    user: str | None
+    password: str | None
+    from_email: str | None
+    starttls: bool
+    timeout: float
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host and self.from_email)
+
+
+def smtp_settings_from_env() -> SmtpSettings:
+    user = os.getenv("SMTP_USER")
+    return SmtpSettings(
+        host=os.getenv("SMTP_HOST"),
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=user,
+        password=os.getenv("SMTP_PASS"),
+        from_email=os.getenv("FROM_EMAIL", user),
+        starttls=os.getenv("SMTP_STARTTLS", "true").lower() != "false",
+        timeout=float(os.getenv("SMTP_TIMEOUT_SECONDS", "10")),
+    )
+
+
+@dataclass
+class OutgoingEmail:
+    to: str
+    subject: str
+    body: str
+    attempts: int = 0
+
+
+class EmailOutbox:
+    """Queues outbound mail and sends it from one background thread.
+
+    The sender keeps a single SMTP connection open between batches and closes
+    it after it has been idle, so a burst of resets pays for one handshake.
+    Failed sends are retried with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        settings_factory=smtp_settings_from_env,
+        batch_size: int = 20,
+        max_attempts: int = 5,
+        backoff_seconds: float = 2.0,
+        idle_timeout_seconds: float = 30.0,
+        max_queued: int = 1000,
+    ):
+        self.settings_factory = settings_factory
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+
+        self._queue = queue.Queue(maxsize=max_queued)
+        self._retries = []
+        self._sequence = itertools.count()
+        self._stop = threading.Event()
+        self._thread = None
+        self._smtp = None
+        self._last_used = 0.0
+        self.sent = 0
+        self.failed = 0
+
+    def settings(self) -> SmtpSettings:
+        return self.settings_factory()
+
+    def enqueue(self, email: OutgoingEmail) -> None:
+        self._queue.put_nowait(email)
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="email-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._disconnect()
+
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._retries)
+
+    def _run(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                batch = self._next_batch()
+                if batch:
+                    self._send_batch(batch)
+                elif self._smtp and time.monotonic() - self._last_used > self.idle_timeout_seconds:
+                    self._disconnect()
+            except Exception:
+                # the sender thread must survive anything, or every later email is dropped
+                logger.exception("Email outbox iteration failed")
+                self._stop.wait(1.0)
+
+    def _next_batch(self) -> list[OutgoingEmail]:
+        now = time.monotonic()
+        batch = []
+        while self._retries and self._retries[0][0] <= now and len(batch) < self.batch_size:
+            batch.append(heapq.heappop(self._retries)[2])
+
+        wait = 0.5
+        if self._retries:
+            wait = min(wait, max(self._retries[0][0] - now, 0))
+        try:
+            if not batch:
+                batch.append(self._queue.get(timeout=wait))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _connect(self, settings: SmtpSettings) -> smtplib.SMTP:
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except smtplib.SMTPException:
+                self._disconnect()
+
+        server = smtplib.SMTP(settings.host, settings.port, timeout=settings.timeout)
+        if settings.starttls:
+            server.starttls()
+        if settings.user and settings.password:
+            server.login(settings.user, settings.password)
+        self._smtp = server
+        return server
+
+    def _disconnect(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            pass
+        self._smtp = None
+
+    def _send_batch(self, batch: list[OutgoingEmail]) -> None:
+        try:
+            settings = self.settings()
+        except Exception as exc:
+            logger.exception("Could not load SMTP settings")
+            for email in batch:
+                self._retry(email, exc)
+            return
+
+        for index, email in enumerate(batch):
+            try:
+                server = self._connect(settings)
+                server.sendmail(settings.from_email, email.to, self._render(settings, email))
+                self._last_used = time.monotonic()
+                self.sent += 1
+            except (smtplib.SMTPException, OSError) as exc:
+                self._disconnect()
+                self._retry(email, exc)
+                if isinstance(exc, (smtplib.SMTPServerDisconnected, OSError)):
+                    # the server is unreachable; back off the rest of the batch too
+                    for remaining in batch[index + 1:]:
+                        self._retry(remaining, exc)
+                    return
+            except Exception as exc:
+                logger.exception("Unexpected error sending email to %s", email.to)
+                self._disconnect()
+                self._retry(email, exc)
+
+    def _retry(self, email: OutgoingEmail, exc: Exception) -> None:
+        email.attempts += 1
+        if email.attempts >= self.max_attempts:
+            self.failed += 1
+            logger.error("Giving up on email to %s after %s attempts: %s", email.to, email.attempts, exc)
+            return
+        delay = self.backoff_seconds * (2 ** (email.attempts - 1))
+        logger.warning("Email to %s failed (%s), retrying in %.1fs", email.to, exc, delay)
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._sequence), email))
+
+    @staticmethod
+    def _render(settings: SmtpSettings, email: OutgoingEmail) -> str:
+        msg = MIMEMultipart()
+        msg["From"] = settings.from_email
+        msg["To"] = email.to
+        msg["Subject"] = email.subject
+        msg.attach(MIMEText(email.body, "plain"))
+        return msg.as_string()
+
+
+email_outbox = EmailOutbox()
@@ -0,0 +1,281 @@
+import heapq
+import itertools
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import DateTime, String, and_, column, or_, select, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    REMINDER_HORIZON_HOURS,
+    REMINDER_LATE_GRACE_MINUTES,
+    REMINDER_RELOAD_SECONDS,
+)
+from app.db.session import SessionLocal
+from app.models.project_event import EventReminderDelivery, ProjectEvent
+from app.models.project_members import ProjectMember
+from app.services.notification_service import EVENT_REMINDER, notify_users
+from app.services.recurrence import InvalidRecurrence, as_utc, expand_occurrences
+
+logger = logging.getLogger(__name__)
+
+REMINDER_LEAD = timedelta(minutes=30)
+
+
+def record_reminder_deliveries(db: Session, occurrences: list[tuple[str, datetime]]) -> dict:
+    """Claims reminders for every member of the given (event_id, start) pairs.
+
+    A single INSERT ... SELECT against the ledger; rows that already exist
+    are skipped, so only members not yet reminded come back.
+    """
+    if not occurrences:
+        return {}
+
+    due = values(
+        column("event_id", String),
+        column("occurrence_start", DateTime(timezone=True)),
+        name="due",
+    ).data(occurrences)
+    recipients = (
+        select(due.c.event_id, due.c.occurrence_start, ProjectMember.user_id)
+        .select_from(due)
+        .join(ProjectEvent, ProjectEvent.id == due.c.event_id)
+        .join(ProjectMember, ProjectMember.project_id == ProjectEvent.project_id)
+    )
+    stmt = (
+        insert(EventReminderDelivery)
+        .from_select(["event_id", "occurrence_start", "user_id"], recipients)
+        .on_conflict_do_nothing()
+        .returning(
+            EventReminderDelivery.event_id,
+            EventReminderDelivery.occurrence_start,
+            EventReminderDelivery.user_id,
+        )
+    )
+
+    claimed = defaultdict(list)
+    for event_id, occurrence_start, user_id in db.execute(stmt):
+        claimed[(event_id, occurrence_start)].append(user_id)
+    return claimed
+
+
+def reminder_start_text(event: ProjectEvent, start_at: datetime) -> str:
+    try:
+        zone = ZoneInfo(event.timezone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        zone = timezone.utc
+    local_start = as_utc(start_at).astimezone(zone)
+    return local_start.strftime("%b %d, %I:%M %p %Z")
+
+
+def event_occurrences(event: ProjectEvent, window_start: datetime, window_end: datetime) -> list[datetime]:
+    if event.is_cancelled:
+        return []
+    try:
+        # widened by a microsecond so an occurrence starting exactly at window_end counts
+        occurrences = expand_occurrences(event, window_start, window_end + timedelta(microseconds=1))
+    except InvalidRecurrence:
+        logger.warning("Skipping reminders for event %s with invalid rrule %r", event.id, event.rrule)
+        return []
+    return [start for start, _ in occurrences if window_start <= start <= window_end]
+
+
+def send_event_reminders(db: Session, due: list[tuple[str, datetime]]) -> int:
+    """Sends the reminders that are still valid and not yet in the ledger."""
+    if not due:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    events = {
+        event.id: event
+        for event in db.query(ProjectEvent).filter(ProjectEvent.id.in_({event_id for event_id, _ in due}))
+    }
+
+    # the heap may hold stale entries; re-check against the current rows
+    valid = []
+    for event_id, occurrence_start in due:
+        event = events.get(event_id)
+        if event is None or occurrence_start <= now:
+            continue
+        if occurrence_start in event_occurrences(event, occurrence_start, occurrence_start):
+            valid.append((event_id, occurrence_start))
+
+    claimed = record_reminder_deliveries(db, valid)
+    for (event_id, occurrence_start), user_ids in claimed.items():
+        event = events[event_id]
+        notify_users(
+            db,
+            user_ids,
+            EVENT_REMINDER,
+            event_title=event.title,
+            start_at=reminder_start_text(event, occurrence_start),
+        )
+    db.commit()
+    return sum(len(user_ids) for user_ids in claimed.values())
+
+
+class ReminderScheduler:
+    """Fires event reminders from an in-memory heap of due times.
+
+    The heap covers the next REMINDER_HORIZON_HOURS and is reloaded from the
+    database on start and every REMINDER_RELOAD_SECONDS; event writes update
+    it in between. Reminders are revalidated when they fire and deduped by
+    the delivery ledger, so stale heap entries or several processes running
+    their own scheduler cannot double-send.
+    """
+
+    def __init__(
+        self,
+        session_factory=SessionLocal,
+        horizon: timedelta = timedelta(hours=REMINDER_HORIZON_HOURS),
+        late_grace: timedelta = timedelta(minutes=REMINDER_LATE_GRACE_MINUTES),
+        reload_seconds: float = REMINDER_RELOAD_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.horizon = horizon
+        self.late_grace = late_grace
+        self.reload_seconds = reload_seconds
+
+        self._heap = []
+        self._versions = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._stop = False
+        self._next_reload = None
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        with self._condition:
+            self._stop = False
+            self._next_reload = None
+        self._thread = threading.Thread(target=self._run, name="event-reminders", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        with self._condition:
+            self._stop = True
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _window(self, now: datetime) -> tuple[datetime, datetime]:
+        # reminders up to late_grace overdue still go out, e.g. after a restart
+        return now + REMINDER_LEAD - self.late_grace, now + REMINDER_LEAD + self.horizon
+
+    def _push(self, event_id: str, occurrences: list[datetime]) -> None:
+        version = next(self._sequence)
+        self._versions[event_id] = version
+        for occurrence_start in occurrences:
+            heapq.heappush(
+                self._heap,
+                (occurrence_start - REMINDER_LEAD, next(self._sequence), event_id, version, occurrence_start),
+            )
+
+    def event_changed(self, event: ProjectEvent) -> None:
+        """Reschedules one event; call after the write has committed."""
+        window_start, window_end = self._window(datetime.now(timezone.utc))
+        occurrences = event_occurrences(event, window_start, window_end)
+        with self._condition:
+            # older heap entries for the event are skipped by version
+            self._push(event.id, occurrences)
+            self._condition.notify()
+
+    def reload(self) -> None:
+        now = datetime.now(timezone.utc)
+        window_start, window_end = self._window(now)
+        with self._condition:
+            # versions handed out after this point are newer than the snapshot read below
+            snapshot_version = next(self._sequence)
+        db: Session = self.session_factory()
+        try:
+            events = (
+                db.query(ProjectEvent)
+                .filter(
+                    ProjectEvent.is_cancelled == False,
+                    or_(
+                        and_(
+                            ProjectEvent.rrule == None,
+                            ProjectEvent.start_at >= window_start,
+                            ProjectEvent.start_at <= window_end,
+                        ),
+                        and_(ProjectEvent.rrule != None, ProjectEvent.start_at <= window_end),
+                    ),
+                )
+                .all()
+            )
+            loaded = [(event.id, event_occurrences(event, window_start, window_end)) for event in events]
+        finally:
+            db.close()
+
+        with self._condition:
+            # keep what event_changed pushed while the snapshot was being read
+            changed = {
+                event_id: version
+                for event_id, version in self._versions.items()
+                if version > snapshot_version
+            }
+            self._heap = [entry for entry in self._heap if changed.get(entry[2]) == entry[3]]
+            heapq.heapify(self._heap)
+            self._versions = dict(changed)
+            for event_id, occurrences in loaded:
+                if event_id not in changed:
+                    self._push(event_id, occurrences)
+            self._next_reload = now + timedelta(seconds=self.reload_seconds)
+            self._condition.notify()
+
+    def _pop_due(self, now: datetime) -> list[tuple[str, datetime]]:
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            _, _, event_id, version, occurrence_start = heapq.heappop(self._heap)
+            if self._versions.get(event_id) == version:
+                due.append((event_id, occurrence_start))
+        return due
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if self._stop:
+                    return
+                now = datetime.now(timezone.utc)
+                reload_due = self._next_reload is None or now >= self._next_reload
+                due = [] if reload_due else self._pop_due(now)
+                if not reload_due and not due:
+                    wake_at = self._next_reload
+                    if self._heap:
+                        wake_at = min(wake_at, self._heap[0][0])
+                    # capped so wall-clock jumps are noticed
+                    self._condition.wait(min(max((wake_at - now).total_seconds(), 0), 60))
+                    continue
+
+            try:
+                if reload_due:
+                    self.reload()
+                else:
+                    self._fire(due)
+            except Exception:
+                logger.exception("Event reminder scheduler iteration failed")
+                with self._condition:
+                    if reload_due:
+                        self._next_reload = datetime.now(timezone.utc) + timedelta(seconds=30)
+                    self._condition.wait(5)
+
+    def _fire(self, due: list[tuple[str, datetime]]) -> None:
+        db: Session = self.session_factory()
+        try:
+            sent = send_event_reminders(db, due)
+            if sent:
+                logger.info("Sent %s event reminder(s)", sent)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+
+reminder_scheduler = ReminderScheduler()
@@ -0,0 +1,105 @@
+import re
+import threading
+import time
+
+import requests
+from google.auth import exceptions
+from google.auth.transport import requests as google_requests
+from google.oauth2 import id_token
+
+from app.core.config import GOOGLE_CERTS_URL
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+def _freshness_seconds(headers) -> int:
+    cache_control = headers.get("cache-control") or headers.get("Cache-Control") or ""
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE.search(cache_control)
+    if not match:
+        return 0
+    age = headers.get("age") or headers.get("Age") or 0
+    try:
+        age = int(age)
+    except (TypeError, ValueError):
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class CachingRequest:
+    """google.auth transport over one pooled session that caches GETs.
+
+    Responses are kept for as long as their Cache-Control headers allow, so
+    Google's signing keys are fetched once per rotation instead of per login.
+    """
+
+    def __init__(self, session: requests.Session | None = None):
+        self._request = google_requests.Request(session=session or requests.Session())
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+
+    def _cached(self, url):
+        with self._lock:
+            entry = self._cache.get(url)
+        if entry and entry[1] > time.monotonic():
+            return entry[0]
+        return None
+
+    def __call__(self, url, method="GET", body=None, headers=None, timeout=None, **kwargs):
+        if method != "GET" or body is not None:
+            return self._request(url, method=method, body=body, headers=headers, timeout=timeout, **kwargs)
+
+        response = self._cached(url)
+        if response is not None:
+            return response
+
+        # one fetch per expiry, however many logins arrive at once
+        with self._fetch_lock:
+            response = self._cached(url)
+            if response is not None:
+                return response
+
+            response = self._request(url, method="GET", headers=headers, timeout=timeout, **kwargs)
+            if response.status == 200:
+                ttl = _freshness_seconds(response.headers)
+                if ttl:
+                    with self._lock:
+                        self._cache[url] = (response, time.monotonic() + ttl)
+            return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+class GoogleIdTokenVerifier:
+    def __init__(self, certs_url: str = GOOGLE_CERTS_URL, request: CachingRequest | None = None):
+        self.certs_url = certs_url
+        self.request = request or CachingRequest()
+
+    def verify(self, token: str, audience: str) -> dict:
+        info = id_token.verify_token(
+            token,
+            self.request,
+            audience=audience,
+            certs_url=self.certs_url,
+        )
+        if info.get("iss") not in GOOGLE_ISSUERS:
+            raise exceptions.GoogleAuthError("Wrong issuer")
+        return info
+
+
+_verifier = GoogleIdTokenVerifier()
+
+
+def get_google_verifier() -> GoogleIdTokenVerifier:
+    return _verifier
+
+
+def set_google_verifier(verifier: GoogleIdTokenVerifier) -> None:
+    global _verifier
+    _verifier = verifier
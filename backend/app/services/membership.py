@@ -0,0 +1,125 @@
+from typing import NamedTuple
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import MEMBERSHIP_CACHE_MAX_ENTRIES, MEMBERSHIP_CACHE_TTL_SECONDS
+from app.models.project import Project
+from app.models.project_members import ProjectMember
+
+
+class MembershipInfo(NamedTuple):
+    role: str
+    is_active: bool
+
+
+# Keyed by (project_id, user_id). Membership writes must call
+# invalidate_membership after they commit.
+membership_cache = TTLCache(MEMBERSHIP_CACHE_MAX_ENTRIES, MEMBERSHIP_CACHE_TTL_SECONDS)
+
+
+def _cache_key(project_id, user_id) -> tuple[str, str]:
+    return str(project_id), str(user_id)
+
+
+def _remember(membership: ProjectMember) -> MembershipInfo:
+    info = MembershipInfo(role=membership.role, is_active=bool(membership.is_active))
+    membership_cache.set(_cache_key(membership.project_id, membership.user_id), info)
+    return info
+
+
+def invalidate_membership(project_id, user_id) -> None:
+    membership_cache.invalidate(_cache_key(project_id, user_id))
+
+
+def invalidate_project_memberships(project_id) -> None:
+    project_key = str(project_id)
+    membership_cache.invalidate_where(lambda key: key[0] == project_key)
+
+
+def load_project_membership(
+    db: Session,
+    project_id: UUID,
+    user_id: str,
+    active_only: bool = False,
+) -> tuple[ProjectMember, Project] | None:
+    q = (
+        db.query(ProjectMember, Project)
+        .join(Project, Project.id == ProjectMember.project_id)
+        .filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.user_id == str(user_id),
+        )
+    )
+    if active_only:
+        q = q.filter(ProjectMember.is_active == True)
+
+    row = q.first()
+    if row:
+        _remember(row[0])
+    return row
+
+
+def get_membership_info(db: Session, project_id: UUID, user_id: str) -> MembershipInfo | None:
+    info = membership_cache.get(_cache_key(project_id, user_id))
+    if info is not None:
+        return info
+
+    membership = (
+        db.query(ProjectMember)
+        .filter(
+            ProjectMember.project_id == project_id,
+            ProjectMember.user_id == str(user_id),
+        )
+        .first()
+    )
+    if not membership:
+        return None
+    return _remember(membership)
+
+
+def check_project_member(
+    db: Session,
+    project_id: UUID,
+    user_id: str,
+    active_only: bool = False,
+) -> MembershipInfo:
+    info = get_membership_info(db, project_id, user_id)
+    if info is None or (active_only and not info.is_active):
+        raise HTTPException(status_code=404, detail="Project not found")
+    return info
+
+
+def require_project_member(
+    db: Session,
+    project_id: UUID,
+    user_id: str,
+    active_only: bool = False,
+    allow_archived: bool = True,
+) -> tuple[ProjectMember, Project]:
+    row = load_project_membership(db, project_id, user_id, active_only=active_only)
+    if not row:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    membership, project = row
+    if not allow_archived and project.status == "archived":
+        raise HTTPException(status_code=400, detail="Project is archived")
+
+    return membership, project
+
+
+
+def project_member_ids(db: Session, project_ids) -> dict:
+    members = {project_id: [] for project_id in project_ids}
+    if not members:
+        return members
+    rows = (
+        db.query(ProjectMember.project_id, ProjectMember.user_id)
+        .filter(ProjectMember.project_id.in_(list(members)))
+        .all()
+    )
+    for project_id, user_id in rows:
+        members[project_id].append(str(user_id))
+    return members
@@ -0,0 +1,76 @@
+import logging
+
+from sqlalchemy.orm import Session
+
+from app.core.config import NOTIFICATION_DISPATCH_BATCH_SIZE
+from app.db.session import SessionLocal
+from app.models.notification import NotificationOutbox
+from app.services.membership import project_member_ids
+from app.services.notification_service import PendingNotification, deliver_notifications
+from app.services.notification_stream import notification_broker, notification_event
+
+logger = logging.getLogger(__name__)
+
+
+def expand_outbox(entries: list[NotificationOutbox], members: dict) -> list[PendingNotification]:
+    """Turns outbox entries into one pending notification per recipient.
+
+    Within a batch, entries sharing a subject collapse into one digest per
+    recipient carrying the latest message. Entries without a subject are
+    always delivered; a recipient listed twice on one entry gets it once.
+    """
+    items = {}
+    for entry in entries:
+        recipients = list(entry.user_ids or [])
+        if entry.project_id is not None:
+            recipients.extend(members.get(entry.project_id, []))
+        for user_id in dict.fromkeys(recipients):
+            key = (user_id, entry.subject) if entry.subject else (user_id, None, entry.id)
+            previous = items.get(key)
+            occurrences = previous.occurrences + 1 if previous and entry.subject else 1
+            items[key] = PendingNotification(
+                user_id, entry.message, entry.created_at, entry.subject, occurrences
+            )
+    return list(items.values())
+
+
+def dispatch_notification_outbox(db: Session, batch_size: int = NOTIFICATION_DISPATCH_BATCH_SIZE) -> int:
+    # SKIP LOCKED lets several workers drain the outbox without blocking each other.
+    entries = (
+        db.query(NotificationOutbox)
+        .order_by(NotificationOutbox.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    if not entries:
+        return 0
+
+    project_ids = {entry.project_id for entry in entries if entry.project_id is not None}
+    members = project_member_ids(db, project_ids)
+    rows = deliver_notifications(db, expand_outbox(entries, members))
+
+    db.query(NotificationOutbox).filter(
+        NotificationOutbox.id.in_([entry.id for entry in entries])
+    ).delete(synchronize_session=False)
+    db.commit()
+
+    try:
+        notification_broker.publish([notification_event(row) for row in rows])
+    except Exception:
+        # streams are best effort; clients resync from GET /notifications
+        logger.exception("Failed to publish %s notification(s) to streams", len(rows))
+    return len(entries)
+
+
+def run_notification_dispatch():
+    db: Session = SessionLocal()
+    try:
+        while dispatch_notification_outbox(db) >= NOTIFICATION_DISPATCH_BATCH_SIZE:
+            pass
+    except Exception:
+        db.rollback()
+        logger.exception("Notification dispatch failed")
+        raise
+    finally:
+        db.close()
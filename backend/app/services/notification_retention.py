@@ -0,0 +1,81 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    NOTIFICATION_COMPACTION_BATCH_SIZE,
+    NOTIFICATION_RETENTION_DAYS,
+    NOTIFICATION_RETENTION_MODE,
+)
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_COLUMNS = ("id", "user_id", "message", "is_read", "created_at", "subject", "occurrences")
+
+
+def compact_notification_batch(
+    db: Session,
+    cutoff: datetime,
+    batch_size: int = NOTIFICATION_COMPACTION_BATCH_SIZE,
+    archive: bool = True,
+) -> int:
+    # only read rows are compacted, so unread counters never change here
+    ids = [
+        notification_id
+        for (notification_id,) in db.query(Notification.id)
+        .filter(Notification.is_read == True, Notification.created_at < cutoff)
+        .order_by(Notification.created_at.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    ]
+    if not ids:
+        return 0
+
+    if archive:
+        columns = [getattr(Notification, name) for name in ARCHIVED_COLUMNS]
+        db.execute(
+            insert(NotificationArchive).from_select(
+                [*ARCHIVED_COLUMNS, "archived_at"],
+                select(*columns, literal(datetime.utcnow())).where(Notification.id.in_(ids)),
+            )
+        )
+    db.query(Notification).filter(Notification.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    return len(ids)
+
+
+def compact_notifications(
+    db: Session,
+    retention_days: int = NOTIFICATION_RETENTION_DAYS,
+    batch_size: int = NOTIFICATION_COMPACTION_BATCH_SIZE,
+    mode: str = NOTIFICATION_RETENTION_MODE,
+) -> int:
+    if mode not in ("archive", "delete"):
+        raise ValueError(f"Unknown notification retention mode: {mode}")
+
+    cutoff = datetime.utcnow() - timedelta(days=retention_days)
+    total = 0
+    # short transactions so the feed is never blocked behind one large delete
+    while True:
+        moved = compact_notification_batch(db, cutoff, batch_size, archive=mode == "archive")
+        total += moved
+        if moved < batch_size:
+            return total
+
+
+def run_notification_compaction():
+    db: Session = SessionLocal()
+    try:
+        compacted = compact_notifications(db)
+        if compacted:
+            logger.info("Compacted %s read notification(s)", compacted)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
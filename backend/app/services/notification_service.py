@@ -1,10 +1,255 @@
+import logging
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from uuid import uuid4
+
+from sqlalchemy import func, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from app.models.notification import Notification
+
+from app.core.config import NOTIFICATION_COALESCE_WINDOW_SECONDS
+from app.db.session import SessionLocal
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def increment_unread(db: Session, counts: dict) -> None:
+    if not counts:
+        return
+    stmt = insert(NotificationCounter).values(
+        [{"user_id": str(user_id), "unread_count": count} for user_id, count in counts.items()]
+    )
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[NotificationCounter.user_id],
+            set_={"unread_count": NotificationCounter.unread_count + stmt.excluded.unread_count},
+        )
+    )
+
+
+def decrement_unread(db: Session, user_id, count: int = 1) -> None:
+    if count <= 0:
+        return
+    db.query(NotificationCounter).filter(NotificationCounter.user_id == str(user_id)).update(
+        {NotificationCounter.unread_count: func.greatest(NotificationCounter.unread_count - count, 0)},
+        synchronize_session=False,
+    )
+
+
+def get_unread_count(db: Session, user_id) -> int:
+    count = (
+        db.query(NotificationCounter.unread_count)
+        .filter(NotificationCounter.user_id == str(user_id))
+        .scalar()
+    )
+    if count is not None:
+        return count
+
+    # no counter row yet (history from before counters existed); the
+    # reconciler creates it, until then fall back to counting
+    return (
+        db.query(func.count(Notification.id))
+        .filter(Notification.user_id == str(user_id), Notification.is_read == False)
+        .scalar()
+    )
+
+
+def reconcile_unread_counters(db: Session) -> int:
+    actual = dict(
+        db.query(Notification.user_id, func.count(Notification.id))
+        .filter(Notification.is_read == False)
+        .group_by(Notification.user_id)
+        .all()
+    )
+    stored = dict(db.query(NotificationCounter.user_id, NotificationCounter.unread_count).all())
+
+    repaired = 0
+    for user_id in set(actual) | set(stored):
+        if user_id is None:
+            continue
+        expected = actual.get(user_id, 0)
+        current = stored.get(user_id)
+        if current == expected:
+            continue
+
+        if current is None:
+            db.execute(
+                insert(NotificationCounter)
+                .values(user_id=user_id, unread_count=expected)
+                .on_conflict_do_nothing(index_elements=[NotificationCounter.user_id])
+            )
+            repaired += 1
+            continue
+
+        logger.warning(
+            "Unread counter drifted for user %s: stored=%s actual=%s", user_id, current, expected
+        )
+        # Skip the repair if a new notification or read moved the counter since the scan.
+        repaired += (
+            db.query(NotificationCounter)
+            .filter(
+                NotificationCounter.user_id == user_id,
+                NotificationCounter.unread_count == current,
+            )
+            .update({NotificationCounter.unread_count: expected}, synchronize_session=False)
+        )
+
+    db.commit()
+    return repaired
+
+
+def run_unread_counter_reconciliation():
+    db: Session = SessionLocal()
+    try:
+        repaired = reconcile_unread_counters(db)
+        if repaired:
+            logger.warning("Reconciled unread counters for %s user(s)", repaired)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# Message templates shared by the single-recipient helpers and the fan-out helpers.
+TASK_STATUS_CHANGED = "Task '{task_title}' moved to {label}."
+TASK_DELETED = "Task '{task_title}' in '{project_name}' was deleted."
+EVENT_CREATED = "New event '{event_title}' scheduled for {start_at}."
+EVENT_UPDATED = "Event '{event_title}' has been updated."
+EVENT_CANCELLED = "Event '{event_title}' has been cancelled."
+EVENT_REMINDER = "Reminder: '{event_title}' starts in 30 minutes ({start_at})."
+
+TASK_STATUS_LABELS = {
+    "todo": "To Do",
+    "in_progress": "In Progress",
+    "done": "Done!",
+}
+
+
+def task_status_label(status: str) -> str:
+    return TASK_STATUS_LABELS.get(status, status)
+
+
+def task_status_subject(task_id) -> str:
+    return f"task-status:{task_id}"
+
+
+class PendingNotification(NamedTuple):
+    user_id: str
+    message: str
+    created_at: datetime
+    subject: str | None = None
+    occurrences: int = 1
+
+
+def digest_message(message: str, occurrences: int) -> str:
+    if occurrences <= 1:
+        return message
+    return f"{message} ({occurrences} updates)"
+
+
+def _merge_into_unread(db: Session, items: list[PendingNotification]) -> tuple[list[dict], list]:
+    """Folds subject items into matching unread rows from the coalescing window."""
+    keyed = {(item.user_id, item.subject): item for item in items if item.subject}
+    if not keyed:
+        return [], items
+
+    window = timedelta(seconds=NOTIFICATION_COALESCE_WINDOW_SECONDS)
+    last_occurrence = func.coalesce(Notification.updated_at, Notification.created_at)
+    # one query for the widest window; each item is then held to its own
+    existing = (
+        db.query(Notification)
+        .filter(
+            tuple_(Notification.user_id, Notification.subject).in_(list(keyed)),
+            Notification.is_read == False,
+            last_occurrence >= min(item.created_at for item in keyed.values()) - window,
+        )
+        .order_by(last_occurrence.desc())
+        .with_for_update()
+        .all()
+    )
+
+    merged = []
+    for notification in existing:
+        key = (notification.user_id, notification.subject)
+        item = keyed.get(key)
+        if item is None:
+            continue
+        if (notification.updated_at or notification.created_at) < item.created_at - window:
+            continue
+        del keyed[key]
+        occurrences = notification.occurrences + item.occurrences
+        merged.append({
+            "id": notification.id,
+            "user_id": notification.user_id,
+            "message": digest_message(item.message, occurrences),
+            "is_read": False,
+            "created_at": notification.created_at,
+            "updated_at": item.created_at,
+            "subject": item.subject,
+            "occurrences": occurrences,
+        })
+    if merged:
+        db.execute(update(Notification), merged)
+
+    remaining = [item for item in items if not item.subject or (item.user_id, item.subject) in keyed]
+    return merged, remaining
+
+
+def deliver_notifications(db: Session, items: list[PendingNotification]) -> list[dict]:
+    """Merges subject items into recent unread rows and bulk-inserts the rest."""
+    merged, remaining = _merge_into_unread(db, items)
+    rows = [
+        {
+            "id": uuid4(),
+            "user_id": str(item.user_id),
+            "message": digest_message(item.message, item.occurrences),
+            "is_read": False,
+            "created_at": item.created_at,
+            "updated_at": None,
+            "subject": item.subject,
+            "occurrences": item.occurrences,
+        }
+        for item in remaining
+    ]
+    if rows:
+        # executemany on a Core insert is sent as multi-row INSERT ... VALUES batches
+        db.execute(insert(Notification), rows)
+        counts = {}
+        for row in rows:
+            counts[row["user_id"]] = counts.get(row["user_id"], 0) + 1
+        increment_unread(db, counts)
+    return merged + rows
+
+
+def enqueue_notification(db: Session, message: str, user_ids=(), project_id=None, subject=None) -> None:
+    """Records a notification in the outbox as part of the caller's transaction.
+
+    Recipients are the given users plus, when project_id is set, every member
+    of the project at dispatch time.
+    """
+    recipients = list(dict.fromkeys(str(user_id) for user_id in user_ids if user_id))
+    if not recipients and project_id is None:
+        return
+    db.add(
+        NotificationOutbox(project_id=project_id, user_ids=recipients, message=message, subject=subject)
+    )
+
 
 def create_notification(db: Session, user_id, message: str):
-    notif = Notification(user_id=user_id, message=message)
-    db.add(notif)
-    return notif
+    enqueue_notification(db, message, user_ids=[user_id])
+
+
+def notify_users(db: Session, user_ids, template: str, subject=None, **fields) -> None:
+    enqueue_notification(db, template.format(**fields), user_ids=user_ids, subject=subject)
+
+
+def notify_project(db: Session, project_id, template: str, also_notify=(), subject=None, **fields) -> None:
+    enqueue_notification(
+        db, template.format(**fields), user_ids=also_notify, project_id=project_id, subject=subject
+    )
+
 
 def notify_added_to_project(db: Session, user_id, project_name: str, role: str):
     create_notification(db, user_id, f"You've been added to {project_name} as {role}.")
@@ -16,31 +261,27 @@ def notify_assignee_changed(db: Session, user_id, task_title: str, new_assignee_
     create_notification(db, user_id, f"Assignee for '{task_title}' changed to {new_assignee_name}.")
 
 def notify_event_created(db: Session, user_id, event_title: str, start_at):
-    create_notification(db, user_id, f"New event '{event_title}' scheduled for {start_at}.")
+    create_notification(db, user_id, EVENT_CREATED.format(event_title=event_title, start_at=start_at))
 
 def notify_event_updated(db: Session, user_id, event_title: str):
-    create_notification(db, user_id, f"Event '{event_title}' has been updated.")
+    create_notification(db, user_id, EVENT_UPDATED.format(event_title=event_title))
 
 def notify_event_cancelled(db: Session, user_id, event_title: str):
-    create_notification(db, user_id, f"Event '{event_title}' has been cancelled.")
+    create_notification(db, user_id, EVENT_CANCELLED.format(event_title=event_title))
 
 def notify_project_created(db: Session, user_id, project_name: str):
     create_notification(db, user_id, f"You created project '{project_name}'. Welcome!")
 
 def notify_task_status_changed(db: Session, user_id, task_title: str, new_status: str):
-    status_labels = {
-        "todo": "To Do",
-        "in_progress": "In Progress", 
-        "done": "Done!"
-    }
-    label = status_labels.get(new_status, new_status)
-    create_notification(db, user_id, f"Task '{task_title}' moved to {label}.")
+    create_notification(
+        db, user_id, TASK_STATUS_CHANGED.format(task_title=task_title, label=task_status_label(new_status))
+    )
 
 def notify_task_deleted(db: Session, user_id, task_title: str, project_name: str):
-    create_notification(db, user_id, f"Task '{task_title}' in '{project_name}' was deleted.")
+    create_notification(db, user_id, TASK_DELETED.format(task_title=task_title, project_name=project_name))
 
 def notify_event_reminder(db: Session, user_id, event_title: str, start_at: str):
-    create_notification(db, user_id, f"Reminder: '{event_title}' starts in 30 minutes ({start_at}).")
+    create_notification(db, user_id, EVENT_REMINDER.format(event_title=event_title, start_at=start_at))
 
 def notify_task_reassigned_to_you(db: Session, user_id, task_title: str, project_name: str):
     create_notification(db, user_id, f"You were assigned to '{task_title}' in {project_name}.")
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from sqlalchemy import text
+
+from app.core.config import NOTIFICATION_STREAM_BACKEND, NOTIFICATION_STREAM_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "notifications"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more.
+MAX_NOTIFY_PAYLOAD_BYTES = 7900
+
+
+class Subscription:
+    """One connected stream. Events are handed over on the stream's own loop.
+
+    When the client cannot keep up the queue fills, further events are
+    dropped and the stream is told to resync from GET /notifications.
+    """
+
+    def __init__(self, user_id: str, loop: asyncio.AbstractEventLoop, max_queued: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.overflowed = False
+
+    def offer(self, event: dict) -> None:
+        self.loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: dict) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class InProcessBroker:
+    """Fans events out to the streams connected to this process."""
+
+    def __init__(self, max_queued: int = NOTIFICATION_STREAM_QUEUE_SIZE):
+        self.max_queued = max_queued
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(str(user_id), asyncio.get_running_loop(), self.max_queued)
+        with self._lock:
+            self._subscriptions.setdefault(subscription.user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is None:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscriptions[subscription.user_id]
+
+    def connected(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def deliver(self, events: list[dict]) -> None:
+        with self._lock:
+            targets = [
+                (subscription, event)
+                for event in events
+                for subscription in self._subscriptions.get(event["user_id"], ())
+            ]
+        for subscription, event in targets:
+            try:
+                subscription.offer(event)
+            except RuntimeError:
+                # the stream's loop has already shut down
+                self.unsubscribe(subscription)
+
+    def publish(self, events: list[dict]) -> None:
+        self.deliver(events)
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class PostgresBroker(InProcessBroker):
+    """Relays events between API processes with LISTEN/NOTIFY.
+
+    publish() only sends NOTIFY; every process, including the publisher,
+    receives the event on its listener thread and fans it out locally.
+    """
+
+    def __init__(self, engine, max_queued: int = NOTIFICATION_STREAM_QUEUE_SIZE, poll_seconds: float = 5.0):
+        super().__init__(max_queued)
+        self.engine = engine
+        self.poll_seconds = poll_seconds
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self, events: list[dict]) -> None:
+        payloads = []
+        for event in events:
+            payload = json.dumps(event)
+            if len(payload.encode()) >= MAX_NOTIFY_PAYLOAD_BYTES:
+                payload = json.dumps({"user_id": event["user_id"], "resync": True})
+            payloads.append(payload)
+        if not payloads:
+            return
+
+        with self.engine.begin() as conn:
+            conn.execute(
+                text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload"),
+                {"channel": NOTIFY_CHANNEL, "payloads": payloads},
+            )
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(self.poll_seconds + 1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Notification listener lost its connection, reconnecting")
+                self._stop.wait(self.poll_seconds)
+
+    def _listen(self) -> None:
+        # a dedicated connection taken out of the pool for the listener's lifetime
+        pooled = self.engine.raw_connection()
+        pooled.detach()
+        conn = pooled.dbapi_connection
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+
+            while not self._stop.is_set():
+                if not select.select([conn], [], [], self.poll_seconds)[0]:
+                    continue
+                conn.poll()
+                events = []
+                while conn.notifies:
+                    events.append(json.loads(conn.notifies.pop(0).payload))
+                if events:
+                    self.deliver(events)
+        finally:
+            conn.close()
+
+
+def create_broker(backend: str = NOTIFICATION_STREAM_BACKEND) -> InProcessBroker:
+    if backend == "postgres":
+        from app.db.session import engine
+
+        return PostgresBroker(engine)
+    if backend != "memory":
+        raise ValueError(f"Unknown notification stream backend: {backend}")
+    return InProcessBroker()
+
+
+notification_broker = create_broker()
+
+
+def notification_event(row: dict) -> dict:
+    return {
+        "id": str(row["id"]),
+        "user_id": str(row["user_id"]),
+        "message": row["message"],
+        "is_read": bool(row["is_read"]),
+        "occurrences": row.get("occurrences", 1),
+        "created_at": row["created_at"].isoformat() if row["created_at"] else None,
+        "updated_at": row["updated_at"].isoformat() if row.get("updated_at") else None,
+    }
@@ -2,6 +2,7 @@ from datetime import datetime, timezone
 from sqlalchemy.orm import Session
 
 from app.models.project import Project
+from app.services.membership import invalidate_project_memberships
 
 
 def delete_expired_projects(db: Session) -> int:
@@ -18,9 +19,14 @@ def delete_expired_projects(db: Session) -> int:
     )
 
     count = len(expired_projects)
+    expired_ids = [project.id for project in expired_projects]
 
     for project in expired_projects:
         db.delete(project)
 
     db.commit()
+
+    for project_id in expired_ids:
+        invalidate_project_memberships(project_id)
+
     return count
\ No newline at end of file
@@ -0,0 +1,207 @@
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.relativedelta import relativedelta
+from dateutil.rrule import DAILY, MONTHLY, WEEKLY, YEARLY, rruleset, rrulestr
+
+from app.core.cache import TTLCache
+from app.core.config import (
+    RECURRENCE_CACHE_MAX_ENTRIES,
+    RECURRENCE_CACHE_TTL_SECONDS,
+    RECURRENCE_MAX_COUNT,
+    RECURRENCE_MAX_OCCURRENCES_PER_MONTH,
+)
+from app.models.project_event import ProjectEvent
+
+
+class InvalidRecurrence(ValueError):
+    pass
+
+
+# Occurrence starts are expanded one UTC calendar month at a time, keyed by
+# (event_id, rrule, start_at, timezone, year, month). Any edit to the rule
+# or the series start changes the key, so entries never need invalidating.
+# Parsed rules, and rules found invalid, are cached by (rrule, start_at, timezone).
+occurrence_cache = TTLCache(RECURRENCE_CACHE_MAX_ENTRIES, RECURRENCE_CACHE_TTL_SECONDS)
+
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _ever_occurs(rule) -> bool:
+    # dateutil walks a rule that never matches (e.g. BYMONTH=2;BYMONTHDAY=30)
+    # period by period up to year 9999. The calendar repeats every 400 years,
+    # so the rule is probed from the same date near the end of that range.
+    dtstart = rule._dtstart
+    year = dtstart.year + (9899 - dtstart.year) // 400 * 400
+    probe = rule.replace(dtstart=dtstart.replace(year=year), count=None, until=None)
+    return next(iter(probe), None) is not None
+
+
+def _check_limits(rules: rruleset) -> None:
+    # dateutil walks a rule one period at a time, so sub-daily rules, rules
+    # with many times per day and rules that never match are refused
+    per_day = 0
+    for rule in rules._rrule:
+        if rule._freq > DAILY:
+            raise InvalidRecurrence("FREQ must be DAILY, WEEKLY, MONTHLY or YEARLY")
+        if rule._count is not None and rule._count > RECURRENCE_MAX_COUNT:
+            raise InvalidRecurrence(f"COUNT may be at most {RECURRENCE_MAX_COUNT}")
+        if not _ever_occurs(rule):
+            raise InvalidRecurrence("rule never produces an occurrence")
+        per_day += len(rule._byhour) * len(rule._byminute) * len(rule._bysecond)
+    if per_day * 31 > RECURRENCE_MAX_OCCURRENCES_PER_MONTH:
+        raise InvalidRecurrence("too many occurrences per day")
+
+
+def parse_rrule(rrule: str, start_at: datetime, tz_name: str | None) -> rruleset:
+    # expand in the event's own zone so a 09:00 scrum stays at 09:00 across DST
+    try:
+        local_start = as_utc(start_at).astimezone(ZoneInfo(tz_name or "UTC"))
+        rules = rrulestr(rrule, dtstart=local_start, forceset=True)
+    except (ValueError, TypeError, ZoneInfoNotFoundError) as exc:
+        raise InvalidRecurrence(str(exc)) from exc
+    _check_limits(rules)
+    return rules
+
+
+def validate_rrule(rrule: str | None, start_at: datetime, tz_name: str | None) -> None:
+    if rrule:
+        parse_rrule(rrule, start_at, tz_name)
+
+
+def _month_start(value: datetime) -> datetime:
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_month(value: datetime) -> datetime:
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def _periods_between(rule, start: datetime, end: datetime) -> relativedelta | None:
+    """The largest whole number of the rule's intervals that fits before end, less one."""
+    if rule._freq in (DAILY, WEEKLY):
+        unit = rule._interval * (7 if rule._freq == WEEKLY else 1)
+        periods = (end.replace(tzinfo=None) - start.replace(tzinfo=None)).days // unit - 1
+        return relativedelta(days=periods * unit) if periods > 0 else None
+    if rule._freq in (MONTHLY, YEARLY):
+        unit = rule._interval * (12 if rule._freq == YEARLY else 1)
+        periods = ((end.year - start.year) * 12 + end.month - start.month) // unit - 1
+        return relativedelta(months=periods * unit) if periods > 0 else None
+    return None
+
+
+def _rebased_rule(rule, window_start: datetime):
+    """The same rule, started a whole number of intervals before window_start.
+
+    Without this dateutil iterates from the series' first occurrence, so
+    cost would grow with the age of the series. Rules with a COUNT keep
+    their start because the count is measured from it.
+    """
+    shift = None if rule._count is not None else _periods_between(rule, rule._dtstart, window_start)
+    if shift is None:
+        return rule
+
+    dtstart = rule._dtstart
+    changes = {"dtstart": (dtstart.replace(tzinfo=None) + shift).replace(tzinfo=dtstart.tzinfo)}
+    # dateutil fills unset BY* parts from dtstart; pin them to the
+    # original start so a shifted, clamped day cannot change the rule
+    given = rule._original_rule
+    if not any(given.get(part) for part in ("byweekno", "byyearday", "bymonthday", "byweekday", "byeaster")):
+        if rule._freq == YEARLY:
+            changes["bymonth"] = given.get("bymonth") or dtstart.month
+            changes["bymonthday"] = dtstart.day
+        elif rule._freq == MONTHLY:
+            changes["bymonthday"] = dtstart.day
+    for part in ("byhour", "byminute", "bysecond"):
+        if not given.get(part):
+            changes[part] = tuple(getattr(rule, f"_{part}"))
+    return rule.replace(**changes)
+
+
+def _rebased_set(rules: rruleset, window_start: datetime) -> rruleset:
+    rebased = rruleset()
+    for rule in rules._rrule:
+        rebased.rrule(_rebased_rule(rule, window_start))
+    for rule in rules._exrule:
+        rebased.exrule(_rebased_rule(rule, window_start))
+    for value in rules._rdate:
+        rebased.rdate(value)
+    for value in rules._exdate:
+        rebased.exdate(value)
+    return rebased
+
+
+def _event_rules(event: ProjectEvent) -> rruleset:
+    key = (event.rrule, as_utc(event.start_at), event.timezone)
+    cached = occurrence_cache.get(key)
+    if cached is None:
+        try:
+            cached = parse_rrule(event.rrule, event.start_at, event.timezone)
+        except InvalidRecurrence as exc:
+            cached = exc
+        occurrence_cache.set(key, cached)
+    if isinstance(cached, InvalidRecurrence):
+        raise InvalidRecurrence(*cached.args)
+    return cached
+
+
+def _expand_month(event: ProjectEvent, month_start: datetime) -> tuple[datetime, ...]:
+    key = (event.id, event.rrule, as_utc(event.start_at), event.timezone, month_start.year, month_start.month)
+    cached = occurrence_cache.get(key)
+    if cached is not None:
+        return cached
+
+    month_end = _next_month(month_start)
+    rules = _event_rules(event)
+    zone = rules._rrule[0]._dtstart.tzinfo if rules._rrule else timezone.utc
+    rules = _rebased_set(rules, month_start.astimezone(zone))
+    starts = []
+    for occurrence in rules.xafter(month_start, inc=True):
+        occurrence = as_utc(occurrence)
+        if occurrence >= month_end:
+            break
+        if len(starts) == RECURRENCE_MAX_OCCURRENCES_PER_MONTH:
+            raise InvalidRecurrence(
+                f"more than {RECURRENCE_MAX_OCCURRENCES_PER_MONTH} occurrences in a month"
+            )
+        starts.append(occurrence)
+
+    occurrences = tuple(starts)
+    occurrence_cache.set(key, occurrences)
+    return occurrences
+
+
+def expand_occurrences(
+    event: ProjectEvent, window_start: datetime, window_end: datetime
+) -> list[tuple[datetime, datetime]]:
+    """Returns the (start, end) of every occurrence overlapping the window.
+
+    Events without an rrule have a single occurrence. Windows should be
+    bounded by the caller; each UTC month in range is expanded at most once.
+    """
+    start_at = as_utc(event.start_at)
+    duration = as_utc(event.end_at) - start_at
+    window_start = as_utc(window_start)
+    window_end = as_utc(window_end)
+
+    if not event.rrule:
+        if start_at < window_end and start_at + duration > window_start:
+            return [(start_at, start_at + duration)]
+        return []
+
+    occurrences = []
+    # an occurrence that began before the window can still overlap it
+    month = _month_start(max(window_start - duration, start_at))
+    while month < window_end:
+        for occurrence_start in _expand_month(event, month):
+            occurrence_end = occurrence_start + duration
+            if occurrence_start < window_end and occurrence_end > window_start:
+                occurrences.append((occurrence_start, occurrence_end))
+        month = _next_month(month)
+    return occurrences
@@ -0,0 +1,80 @@
+import logging
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.sprint import Sprint
+from app.models.story import Story
+from app.services.burndown import StoryState
+
+logger = logging.getLogger(__name__)
+
+
+def velocity_contribution(state: StoryState | None) -> int:
+    if state is None or state.sprint_id is None or not state.is_done:
+        return 0
+    return state.points
+
+
+def apply_velocity_change(
+    db: Session, before: StoryState | None, after: StoryState | None
+) -> None:
+    deltas = {}
+    if before is not None and before.sprint_id is not None:
+        deltas[before.sprint_id] = deltas.get(before.sprint_id, 0) - velocity_contribution(before)
+    if after is not None and after.sprint_id is not None:
+        deltas[after.sprint_id] = deltas.get(after.sprint_id, 0) + velocity_contribution(after)
+
+    for sprint_id, delta in deltas.items():
+        if not delta:
+            continue
+        # Applied in SQL so concurrent story updates cannot lose increments.
+        db.query(Sprint).filter(Sprint.id == sprint_id).update(
+            {Sprint.sprint_velocity: Sprint.sprint_velocity + delta},
+            synchronize_session=False,
+        )
+
+
+def reconcile_sprint_velocities(db: Session) -> int:
+    done_points = func.coalesce(
+        func.sum(case((Story.isDone == True, Story.points), else_=0)), 0
+    )
+    rows = (
+        db.query(Sprint.id, Sprint.sprint_velocity, done_points)
+        .outerjoin(Story, Story.sprint_id == Sprint.id)
+        .group_by(Sprint.id, Sprint.sprint_velocity)
+        .all()
+    )
+
+    drifted = 0
+    for sprint_id, stored, velocity in rows:
+        velocity = int(velocity or 0)
+        if stored == velocity:
+            continue
+
+        logger.warning(
+            "Sprint %s velocity drifted: stored=%s actual=%s", sprint_id, stored, velocity
+        )
+        # Skip the repair if a story change moved the counter since the scan.
+        drifted += (
+            db.query(Sprint)
+            .filter(Sprint.id == sprint_id, Sprint.sprint_velocity == stored)
+            .update({Sprint.sprint_velocity: velocity}, synchronize_session=False)
+        )
+
+    db.commit()
+    return drifted
+
+
+def run_velocity_reconciliation():
+    db: Session = SessionLocal()
+    try:
+        drifted = reconcile_sprint_velocities(db)
+        if drifted:
+            logger.warning("Reconciled velocity for %s sprint(s)", drifted)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
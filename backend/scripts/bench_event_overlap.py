@@ -0,0 +1,196 @@
+"""Benchmarks calendar overlap queries on project_events-shaped data.
+
+Runs against the Postgres database in DATABASE_URL, inside a throwaway
+schema that is dropped afterwards:
+
+    cd backend
+    python -m scripts.bench_event_overlap --sizes 10000 100000 1000000
+
+For each table size it compares three strategies for "events of one
+project overlapping a one-month window":
+
+  separate   B-tree indexes on start_at and end_at (the original layout)
+  bounded    composite (project_id, start_at) index, with the scan bounded
+             below by window_start - EVENT_MAX_DURATION_DAYS
+  gist       GiST index on (project_id, tstzrange(start_at, end_at)),
+             needs the btree_gist extension and is skipped without it
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine, text
+
+SCHEMA = "bench_event_overlap"
+MAX_DURATION_DAYS = 31
+SPAN_DAYS = 5 * 365
+BASE = datetime(2021, 1, 1, tzinfo=timezone.utc)
+
+STRATEGIES = {
+    "separate": {
+        "indexes": [
+            "CREATE INDEX ON events (project_id)",
+            "CREATE INDEX ON events (start_at)",
+            "CREATE INDEX ON events (end_at)",
+        ],
+        "query": """
+            SELECT id FROM events
+            WHERE project_id = :project_id AND start_at < :window_end AND end_at > :window_start
+        """,
+    },
+    "bounded": {
+        "indexes": ["CREATE INDEX ON events (project_id, start_at)"],
+        "query": f"""
+            SELECT id FROM events
+            WHERE project_id = :project_id
+              AND start_at < :window_end
+              AND start_at > CAST(:window_start AS timestamptz) - interval '{MAX_DURATION_DAYS} days'
+              AND end_at > :window_start
+        """,
+    },
+    "gist": {
+        "extension": "CREATE EXTENSION IF NOT EXISTS btree_gist",
+        "indexes": ["CREATE INDEX ON events USING gist (project_id, tstzrange(start_at, end_at))"],
+        "query": """
+            SELECT id FROM events
+            WHERE project_id = :project_id
+              AND tstzrange(start_at, end_at) && tstzrange(:window_start, :window_end)
+        """,
+    },
+}
+
+
+def load_events(conn, size: int, projects: int) -> None:
+    # mostly short meetings, with a tail of multi-day events up to the cap
+    conn.execute(text("DROP TABLE IF EXISTS events"))
+    conn.execute(
+        text(
+            """
+            CREATE TABLE events AS
+            SELECT
+                n AS id,
+                (n % :projects) AS project_id,
+                start_at,
+                start_at + CASE
+                    WHEN random() < 0.98 THEN interval '15 minutes' * (1 + floor(random() * 32))
+                    ELSE interval '1 day' * (1 + floor(random() * :max_days))
+                END AS end_at
+            FROM (
+                SELECT n, CAST(:base AS timestamptz) + interval '1 second' * floor(random() * :span) AS start_at
+                FROM generate_series(1, :size) AS n
+            ) AS generated
+            """
+        ),
+        {
+            "projects": projects,
+            "max_days": MAX_DURATION_DAYS - 1,
+            "base": BASE,
+            "span": SPAN_DAYS * 86400,
+            "size": size,
+        },
+    )
+
+
+def drop_indexes(conn) -> None:
+    names = conn.execute(
+        text("SELECT indexname FROM pg_indexes WHERE schemaname = :schema AND tablename = 'events'"),
+        {"schema": SCHEMA},
+    ).scalars()
+    for name in list(names):
+        conn.execute(text(f'DROP INDEX "{name}"'))
+
+
+def time_queries(conn, query: str, windows: list[dict]) -> list[float]:
+    statement = text(query)
+    for params in windows[:5]:
+        conn.execute(statement, params).fetchall()
+
+    timings = []
+    for params in windows:
+        started = time.perf_counter()
+        conn.execute(statement, params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def random_windows(count: int, projects: int, seed: int) -> list[dict]:
+    rng = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        window_start = BASE + timedelta(days=rng.randrange(SPAN_DAYS - 31))
+        windows.append(
+            {
+                "project_id": rng.randrange(projects),
+                "window_start": window_start,
+                "window_end": window_start + timedelta(days=31),
+            }
+        )
+    return windows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = create_engine(os.environ["DATABASE_URL"])
+    windows = random_windows(args.queries, args.projects, args.seed)
+
+    print(f"{'events':>10}  {'strategy':<9}  {'median ms':>9}  {'p95 ms':>8}  {'rows':>6}")
+    with engine.connect() as conn:
+        conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+        conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+        conn.execute(text(f"SET search_path TO {SCHEMA}, public"))
+        conn.commit()
+        try:
+            for size in args.sizes:
+                load_events(conn, size, args.projects)
+                conn.commit()
+
+                expected = None
+                for name, strategy in STRATEGIES.items():
+                    if "extension" in strategy:
+                        try:
+                            conn.execute(text(strategy["extension"]))
+                            conn.commit()
+                        except Exception as exc:
+                            conn.rollback()
+                            print(f"{size:>10}  {name:<9}  skipped ({exc.__class__.__name__})")
+                            continue
+
+                    drop_indexes(conn)
+                    for statement in strategy["indexes"]:
+                        conn.execute(text(statement))
+                    conn.execute(text("ANALYZE events"))
+                    conn.commit()
+
+                    rows = sum(
+                        len(conn.execute(text(strategy["query"]), params).fetchall()) for params in windows
+                    )
+                    if expected is None:
+                        expected = rows
+                    elif rows != expected:
+                        raise SystemExit(f"{name} returned {rows} rows, expected {expected}")
+
+                    timings = time_queries(conn, strategy["query"], windows)
+                    p95 = statistics.quantiles(timings, n=20)[-1]
+                    print(
+                        f"{size:>10}  {name:<9}  {statistics.median(timings):>9.3f}  {p95:>8.3f}  "
+                        f"{rows // len(windows):>6}"
+                    )
+                    conn.commit()
+        finally:
+            conn.rollback()
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
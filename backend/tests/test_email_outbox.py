@@ -0,0 +1,173 @@
+import smtplib
+import time
+
+import pytest
+
+from app.services import email_outbox as outbox_module
+from app.services.email_outbox import EmailOutbox, OutgoingEmail, SmtpSettings
+
+
+class FakeSMTP:
+    """Records what the outbox does instead of talking to a mail server."""
+
+    connections = []
+    # exceptions raised by the next sendmail calls, in order
+    failures = []
+
+    def __init__(self, host, port, timeout=None):
+        self.host = host
+        self.port = port
+        self.sent = []
+        self.closed = False
+        FakeSMTP.connections.append(self)
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def noop(self):
+        if self.closed:
+            raise smtplib.SMTPServerDisconnected("closed")
+        return (250, b"OK")
+
+    def sendmail(self, from_email, to, message):
+        if FakeSMTP.failures:
+            raise FakeSMTP.failures.pop(0)
+        self.sent.append((from_email, to, message))
+
+    def quit(self):
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_smtp(monkeypatch):
+    FakeSMTP.connections = []
+    FakeSMTP.failures = []
+    monkeypatch.setattr(outbox_module.smtplib, "SMTP", FakeSMTP)
+    return FakeSMTP
+
+
+def settings():
+    return SmtpSettings(
+        host="localhost",
+        port=2525,
+        user="user",
+        password="secret",
+        from_email="noreply@sprintwheel.test",
+        starttls=True,
+        timeout=1.0,
+    )
+
+
+def make_outbox(**kwargs):
+    kwargs.setdefault("settings_factory", settings)
+    kwargs.setdefault("backoff_seconds", 0.01)
+    return EmailOutbox(**kwargs)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def sent_to():
+    return [to for connection in FakeSMTP.connections for _, to, _ in connection.sent]
+
+
+def test_batch_reuses_one_connection():
+    outbox = make_outbox(batch_size=3)
+    for index in range(5):
+        outbox.enqueue(OutgoingEmail(to=f"user{index}@example.com", subject="Reset", body="link"))
+
+    outbox.start()
+    try:
+        assert wait_for(lambda: outbox.sent == 5)
+    finally:
+        outbox.stop()
+
+    assert len(FakeSMTP.connections) == 1
+    assert sorted(sent_to()) == [f"user{index}@example.com" for index in range(5)]
+    assert FakeSMTP.connections[0].closed
+
+
+def test_failed_send_is_retried_on_a_new_connection():
+    FakeSMTP.failures = [smtplib.SMTPServerDisconnected("dropped")]
+    outbox = make_outbox()
+    outbox.enqueue(OutgoingEmail(to="a@example.com", subject="Reset", body="link"))
+    outbox.enqueue(OutgoingEmail(to="b@example.com", subject="Reset", body="link"))
+
+    outbox.start()
+    try:
+        assert wait_for(lambda: outbox.sent == 2)
+    finally:
+        outbox.stop()
+
+    assert sorted(sent_to()) == ["a@example.com", "b@example.com"]
+    assert len(FakeSMTP.connections) == 2
+    assert outbox.failed == 0
+
+
+def test_gives_up_after_max_attempts():
+    FakeSMTP.failures = [smtplib.SMTPRecipientsRefused({}) for _ in range(3)]
+    outbox = make_outbox(max_attempts=3)
+    outbox.enqueue(OutgoingEmail(to="a@example.com", subject="Reset", body="link"))
+
+    outbox.start()
+    try:
+        assert wait_for(lambda: outbox.failed == 1)
+    finally:
+        outbox.stop()
+
+    assert outbox.sent == 0
+    assert outbox.pending() == 0
+
+
+def test_sender_survives_unexpected_errors():
+    calls = []
+
+    def flaky_settings():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("settings unavailable")
+        return settings()
+
+    outbox = make_outbox(settings_factory=flaky_settings)
+    outbox.enqueue(OutgoingEmail(to="a@example.com", subject="Reset", body="link"))
+
+    outbox.start()
+    try:
+        assert wait_for(lambda: outbox.sent == 1)
+        outbox.enqueue(OutgoingEmail(to="b@example.com", subject="Reset", body="link"))
+        assert wait_for(lambda: outbox.sent == 2)
+    finally:
+        outbox.stop()
+
+    assert sorted(sent_to()) == ["a@example.com", "b@example.com"]
+
+
+def test_sender_thread_outlives_a_failed_iteration(monkeypatch):
+    outbox = make_outbox()
+    next_batch = outbox._next_batch
+    calls = []
+
+    def failing_once():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return next_batch()
+
+    monkeypatch.setattr(outbox, "_next_batch", failing_once)
+    outbox.enqueue(OutgoingEmail(to="a@example.com", subject="Reset", body="link"))
+
+    outbox.start()
+    try:
+        assert wait_for(lambda: outbox.sent == 1)
+        assert outbox._thread.is_alive()
+    finally:
+        outbox.stop()
@@ -184,7 +184,9 @@ export default function ProductBacklogPage(): JSX.Element {
     setLoading(true);
     try {
       const data = await api<Story[]>(`/stories?project_id=${projectId}`);
-      setStories(cleanStories(Array.isArray(data) ? data : []));
+      // the server returns stories highest rank first; priorities on the page
+      // are positions in that order
+      setStories(cleanStories(resequencePriorities(Array.isArray(data) ? data : [])));
     } catch (err) {
       console.error("Error fetching stories:", err);
       setStories([]);
@@ -219,27 +221,20 @@ export default function ProductBacklogPage(): JSX.Element {
           title: newTitle.trim(),
           description: newDescription.trim() || null,
           points: normalizePoints(newPoints),
-          priority: stories.length + 1,
         }),
       });
 
+      // new backlog stories are ranked above every existing story
       const normalizedStory: Story = {
         ...createdStory,
         points: normalizePoints(createdStory.points),
-        priority:
-          typeof createdStory.priority === "number" && Number.isFinite(createdStory.priority)
-            ? createdStory.priority
-            : stories.length + 1,
       };
 
-      const nextStories = resequencePriorities(sortStoriesByPriority([...stories, normalizedStory]));
-      setStories(nextStories);
+      setStories(resequencePriorities([normalizedStory, ...stories]));
 
       setNewTitle("");
       setNewDescription("");
       setNewPoints(1);
-
-      await persistPriorityOrder(nextStories, stories);
     } catch (err) {
       console.error("Error creating backlog story:", err);
     }
@@ -270,7 +265,7 @@ export default function ProductBacklogPage(): JSX.Element {
         cleanStories(
           prev.map((story) =>
             story.id === storyId
-              ? { ...updatedStory, points: normalizePoints(updatedStory.points) }
+              ? { ...updatedStory, priority: story.priority, points: normalizePoints(updatedStory.points) }
               : story
           )
         )
@@ -332,7 +327,7 @@ export default function ProductBacklogPage(): JSX.Element {
         cleanStories(
           prev.map((story) =>
             story.id === storyId
-              ? { ...updatedStory, points: normalizePoints(updatedStory.points) }
+              ? { ...updatedStory, priority: story.priority, points: normalizePoints(updatedStory.points) }
               : story
           )
         )
@@ -373,7 +368,7 @@ export default function ProductBacklogPage(): JSX.Element {
         cleanStories(
           prev.map((item) =>
             item.id === storyId
-              ? { ...updatedStory, points: normalizePoints(updatedStory.points) }
+              ? { ...updatedStory, priority: item.priority, points: normalizePoints(updatedStory.points) }
               : item
           )
         )
@@ -472,8 +467,6 @@ export default function ProductBacklogPage(): JSX.Element {
       await api<{ status: string }>(`/stories/${storyId}`, {
         method: "DELETE",
       });
-
-      await persistPriorityOrder(resequencedStories, previousStories.filter((story) => story.id !== storyId));
     } catch (err) {
       console.error("Error deleting story:", err);
       setStories(previousStories);